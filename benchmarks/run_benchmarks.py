@@ -0,0 +1,178 @@
+"""
+Offline benchmarks for the dashboard components and data functions.
+
+Every benchmark runs against SyntheticSession at several (drivers x laps)
+scales, without the live F1 API. Each result is printed and emitted as one
+JSON line so runs can be compared:
+
+    uv run python -m benchmarks.run_benchmarks --output before.jsonl
+    uv run python -m benchmarks.run_benchmarks --output after.jsonl --compare before.jsonl
+
+Components run in Streamlit "bare" mode, so their timings include figure
+building and serialization but no browser.
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import time
+import tracemalloc
+
+import streamlit as st
+
+from benchmarks.synthetic import make_session
+from utils import data_loader
+from utils.downsample import downsample_frame
+from utils.processing import GapEngine, PositionEvents, calculate_gap, calculate_overtakes, SessionSummary
+
+from components.track_map import render_track_map
+from components.telemetry import render_telemetry_traces
+from components.strategy import render_tyre_stints, render_lap_time_distribution
+from components.lap_analysis import render_position_chart, render_gap_analysis, render_lap_data_table
+
+DEFAULT_SCALES = ['1x50', '5x60', '10x70', '20x78']
+
+
+def _first(drivers):
+    return drivers[0]
+
+
+BENCHMARKS = {
+    # Components
+    'render_track_map': lambda s, d: render_track_map(s, d),
+    'render_telemetry_traces': lambda s, d: render_telemetry_traces(s, d),
+    'render_tyre_stints': lambda s, d: render_tyre_stints(s, d),
+    'render_lap_time_distribution': lambda s, d: render_lap_time_distribution(s, d),
+    'render_position_chart': lambda s, d: render_position_chart(s, d),
+    'render_gap_analysis': lambda s, d: render_gap_analysis(s, d),
+    'render_lap_data_table': lambda s, d: render_lap_data_table(s, d),
+    # Data functions
+    'load_telemetry_batch': lambda s, d: data_loader.load_telemetry_batch(s, [(driver, None) for driver in d]),
+    'downsample_frame': lambda s, d: downsample_frame(
+        data_loader.load_lap_telemetry(s, _first(d)), 500, ['Speed', 'RPM', 'Throttle']),
+    'load_lap_comparison': lambda s, d: data_loader.load_lap_comparison(s, [(driver, None) for driver in d]),
+    'GapEngine': lambda s, d: GapEngine(s.laps),
+    'calculate_gap': lambda s, d: calculate_gap(s.laps, d[0], d[-1]),
+    'PositionEvents': lambda s, d: PositionEvents(s.laps),
+    'calculate_overtakes': lambda s, d: calculate_overtakes(s.laps),
+    'load_overtakes': lambda s, d: data_loader.load_overtakes(s),
+    'SessionSummary': lambda s, d: SessionSummary(s.laps, s.results),
+}
+
+
+class _ErrorRecorder:
+    """
+    Collects st.error messages, which the components use to report failures.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def __call__(self, message, *args, **kwargs):
+        self.messages.append(str(message))
+
+
+def _parse_scale(text):
+    drivers, laps = text.lower().split('x')
+    return int(drivers), int(laps)
+
+
+def _time_call(func, session, drivers, cold):
+    if cold:
+        data_loader.clear_caches()
+    start = time.perf_counter()
+    func(session, drivers)
+    return time.perf_counter() - start
+
+
+def run_benchmark(name, func, session, drivers, repeat):
+    """
+    Time one benchmark cold (caches cleared) and warm, and measure its peak allocation.
+    """
+    errors = _ErrorRecorder()
+    st.error = errors
+
+    cold = [_time_call(func, session, drivers, cold=True) for _ in range(repeat)]
+    warm = [_time_call(func, session, drivers, cold=False) for _ in range(repeat)]
+
+    data_loader.clear_caches()
+    tracemalloc.start()
+    func(session, drivers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'benchmark': name,
+        'cold_median_s': statistics.median(cold),
+        'cold_min_s': min(cold),
+        'warm_median_s': statistics.median(warm),
+        'peak_mem_kib': peak / 1024,
+        'errors': errors.messages[:3],
+    }
+
+
+def compare(results, baseline_path):
+    """
+    Print the cold-median ratio of each result against a previous run.
+    """
+    with open(baseline_path) as f:
+        baseline = {
+            (r['benchmark'], r['drivers'], r['laps']): r
+            for r in map(json.loads, f) if 'benchmark' in r
+        }
+
+    print(f"\nComparison against {baseline_path} (cold median, new / old):")
+    for r in results:
+        old = baseline.get((r['benchmark'], r['drivers'], r['laps']))
+        if old is None or not old['cold_median_s']:
+            continue
+        ratio = r['cold_median_s'] / old['cold_median_s']
+        flag = '  <-- slower' if ratio > 1.2 else ''
+        print(f"  {r['benchmark']:<30} {r['drivers']:>2}x{r['laps']:<3} {ratio:6.2f}x{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run offline dashboard benchmarks on synthetic sessions.")
+    parser.add_argument('--scales', nargs='+', default=DEFAULT_SCALES, help="DRIVERSxLAPS, e.g. 20x78")
+    parser.add_argument('--only', nargs='+', help="Run only benchmarks whose name contains one of these")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="Write results as JSON lines to this file")
+    parser.add_argument('--compare', help="JSON lines file of a previous run to compare against")
+    parser.add_argument('--label', default='', help="Free-form label stored with every result")
+    args = parser.parse_args(argv)
+
+    # Streamlit logs a warning for every call made outside `streamlit run`
+    logging.disable(logging.WARNING)
+
+    names = [n for n in BENCHMARKS if not args.only or any(o in n for o in args.only)]
+    meta = {
+        'label': args.label,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+    }
+
+    results = []
+    for scale in args.scales:
+        n_drivers, n_laps = _parse_scale(scale)
+        session = make_session(n_drivers, n_laps)
+        drivers = sorted(session.results['Abbreviation'])
+        for name in names:
+            result = dict(run_benchmark(name, BENCHMARKS[name], session, drivers, args.repeat),
+                          drivers=n_drivers, laps=n_laps, **meta)
+            results.append(result)
+            status = f"  ERROR: {result['errors'][0]}" if result['errors'] else ''
+            print(f"{name:<30} {n_drivers:>2}x{n_laps:<3} cold {result['cold_median_s'] * 1000:9.1f} ms  "
+                  f"warm {result['warm_median_s'] * 1000:9.1f} ms  peak {result['peak_mem_kib']:9.0f} KiB{status}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            for result in results:
+                f.write(json.dumps(result) + '\n')
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
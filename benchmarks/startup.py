@@ -0,0 +1,92 @@
+"""
+Startup benchmark: time-to-first-paint of the landing page on a cold process.
+
+Each repetition starts a fresh interpreter that runs main.py once through
+Streamlit's AppTest (no browser, no session selected) and reports how long
+importing Streamlit took, how long the script took to render the welcome
+screen and sidebar, and which heavy libraries were imported on the way:
+
+    uv run python -m benchmarks.startup --repeat 5
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+# Libraries that should only be imported once a session is loaded
+HEAVY_MODULES = ['pandas', 'fastf1', 'pyarrow', 'plotly.express', 'components.track_map', 'utils.data_loader']
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, logging, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+logging.disable(logging.WARNING)
+imported = time.perf_counter()
+app = AppTest.from_file('main.py', default_timeout=60)
+app.run()
+done = time.perf_counter()
+print(json.dumps({
+    'streamlit_import_s': imported - start,
+    'first_paint_s': done - imported,
+    'errors': [str(e.value) for e in app.exception],
+    'heavy_modules': [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def measure_once():
+    """
+    Run main.py once in a fresh interpreter and return its timings.
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD % (HEAVY_MODULES,)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - start
+    return dict(json.loads(result.stdout.strip().splitlines()[-1]), process_wall_s=wall)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the dashboard's cold-start time to first paint.")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=1.0, help="First-paint budget in seconds")
+    parser.add_argument('--output', help="Append the result as a JSON line to this file")
+    parser.add_argument('--label', default='')
+    args = parser.parse_args(argv)
+
+    runs = [measure_once() for _ in range(args.repeat)]
+    result = {
+        'benchmark': 'startup',
+        'label': args.label,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'first_paint_median_s': statistics.median(r['first_paint_s'] for r in runs),
+        'streamlit_import_median_s': statistics.median(r['streamlit_import_s'] for r in runs),
+        'process_wall_median_s': statistics.median(r['process_wall_s'] for r in runs),
+        'heavy_modules': runs[-1]['heavy_modules'],
+        'errors': runs[-1]['errors'],
+    }
+
+    print(f"first paint     {result['first_paint_median_s'] * 1000:8.1f} ms  (budget {args.budget * 1000:.0f} ms)")
+    print(f"streamlit import {result['streamlit_import_median_s'] * 1000:7.1f} ms")
+    print(f"process wall    {result['process_wall_median_s'] * 1000:8.1f} ms")
+    print(f"heavy modules imported: {', '.join(result['heavy_modules']) or 'none'}")
+    for error in result['errors']:
+        print(f"ERROR: {error}")
+
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+
+    return 0 if result['first_paint_median_s'] <= args.budget and not result['errors'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Synthetic stand-ins for FastF1 sessions.
+
+SyntheticSession produces laps, results, circuit corners and per-lap
+telemetry with the same columns the dashboard uses, so every component and
+data function can be exercised without the live F1 API.
+"""
+from types import SimpleNamespace
+
+import fastf1
+import numpy as np
+import pandas as pd
+
+DRIVERS = [
+    ('VER', '1', 'Red Bull Racing'), ('PER', '11', 'Red Bull Racing'),
+    ('LEC', '16', 'Ferrari'), ('SAI', '55', 'Ferrari'),
+    ('HAM', '44', 'Mercedes'), ('RUS', '63', 'Mercedes'),
+    ('NOR', '4', 'McLaren'), ('PIA', '81', 'McLaren'),
+    ('ALO', '14', 'Aston Martin'), ('STR', '18', 'Aston Martin'),
+    ('GAS', '10', 'Alpine'), ('OCO', '31', 'Alpine'),
+    ('ALB', '23', 'Williams'), ('SAR', '2', 'Williams'),
+    ('TSU', '22', 'RB'), ('RIC', '3', 'RB'),
+    ('BOT', '77', 'Kick Sauber'), ('ZHO', '24', 'Kick Sauber'),
+    ('HUL', '27', 'Haas F1 Team'), ('MAG', '20', 'Haas F1 Team'),
+]
+
+# Lap time lost per lap of tyre age (s)
+DEGRADATION = {'SOFT': 0.09, 'MEDIUM': 0.06, 'HARD': 0.04}
+
+GEAR_EDGES = np.array([0, 80, 110, 140, 170, 200, 230, 260, 400])  # km/h
+SESSION_START = 3600.0  # session time of the race start (s)
+
+
+def _make_track(rng, length, n_samples):
+    """
+    Closed circuit with a speed profile limited by curvature, acceleration and braking.
+    """
+    # Random polygon around a circle, resampled evenly and smoothed so each
+    # vertex becomes a corner joined by straights
+    n_vertices = 14
+    angles = np.sort(rng.uniform(0, 2 * np.pi, n_vertices))
+    radii = rng.uniform(0.55, 1.0, n_vertices)
+    vx = np.append(radii * np.cos(angles), radii[0] * np.cos(angles[0]))
+    vy = np.append(radii * np.sin(angles), radii[0] * np.sin(angles[0]))
+    edge = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(vx), np.diff(vy)))])
+    samples = np.linspace(0, edge[-1], n_samples, endpoint=False)
+    x, y = np.interp(samples, edge, vx), np.interp(samples, edge, vy)
+
+    window = max(3, n_samples // 60)
+    kernel = np.ones(window) / window
+    x = np.convolve(np.concatenate([x[-window:], x, x[:window]]), kernel, 'same')[window:-window]
+    y = np.convolve(np.concatenate([y[-window:], y, y[:window]]), kernel, 'same')[window:-window]
+
+    step = np.hypot(np.diff(x, append=x[0]), np.diff(y, append=y[0]))
+    scale = length / step.sum()
+    x, y, step = x * scale, y * scale, step * scale
+    distance = np.concatenate([[0.0], np.cumsum(step)[:-1]])
+
+    dx, dy = np.gradient(x), np.gradient(y)
+    ddx, ddy = np.gradient(dx), np.gradient(dy)
+    curvature = np.abs(dx * ddy - dy * ddx) / np.maximum((dx ** 2 + dy ** 2) ** 1.5, 1e-9)
+
+    # Lateral grip limit, then forward (traction) and backward (braking) passes
+    v_limit = np.clip(np.sqrt(40.0 / np.maximum(curvature, 1e-6)), 22.0, 92.0)  # m/s
+    v = v_limit.copy()
+    for _ in range(2):  # second lap of the loop settles the start/finish join
+        for i in range(1, n_samples):
+            v[i] = min(v[i], np.sqrt(v[i - 1] ** 2 + 2 * 9.0 * step[i - 1]))
+        for i in range(n_samples - 2, -1, -1):
+            v[i] = min(v[i], np.sqrt(v[i + 1] ** 2 + 2 * 30.0 * step[i]))
+
+    accel = np.gradient(v)
+    corner_idx = np.flatnonzero(
+        (curvature > np.roll(curvature, 1)) & (curvature >= np.roll(curvature, -1)) & (v_limit < 70)
+    )
+    return SimpleNamespace(
+        x=x, y=y, distance=distance, step=step, speed=v, accel=accel,
+        length=length, corner_idx=corner_idx
+    )
+
+
+def _lap_plan(rng, n_laps):
+    """
+    Pit laps and compounds for one driver (one or two stops).
+    """
+    stops = int(rng.integers(1, 3))
+    pit_laps = np.sort(rng.choice(np.arange(12, n_laps - 8), size=stops, replace=False))
+    compounds = list(rng.choice(['SOFT', 'MEDIUM', 'HARD'], size=stops + 1))
+    if len(set(compounds)) == 1:
+        compounds[-1] = 'HARD' if compounds[0] != 'HARD' else 'MEDIUM'
+    return pit_laps, compounds
+
+
+def _make_laps(rng, drivers, n_laps, base_lap_time):
+    rows = []
+    retiring = rng.integers(len(drivers)) if len(drivers) >= 10 else None
+    for i, (abbr, number, team) in enumerate(drivers):
+        pace = i * 0.08 + rng.normal(0, 0.15)
+        pit_laps, compounds = _lap_plan(rng, n_laps)
+        last_lap = int(rng.integers(n_laps // 3, n_laps)) if i == retiring else n_laps
+
+        time = SESSION_START
+        stint, tyre_life, best = 1, 1, np.inf
+        for lap in range(1, last_lap + 1):
+            in_lap = lap in pit_laps
+            out_lap = (lap - 1) in pit_laps
+            if out_lap:
+                stint, tyre_life = stint + 1, 1
+            compound = compounds[stint - 1]
+
+            lap_time = (base_lap_time + pace + DEGRADATION[compound] * tyre_life
+                        - 0.035 * lap + rng.normal(0, 0.25))
+            lap_time += 4.0 * (lap == 1) + 4.5 * in_lap + 18.0 * out_lap
+            start, time = time, time + lap_time
+
+            sectors = np.array([0.31, 0.38, 0.31]) + rng.normal(0, 0.003, 3)
+            sectors = sectors / sectors.sum() * lap_time
+            personal_best = not (in_lap or out_lap or lap == 1) and lap_time < best
+            best = min(best, lap_time) if personal_best else best
+
+            rows.append({
+                'Time': time, 'Driver': abbr, 'DriverNumber': number, 'LapTime': lap_time,
+                'LapNumber': float(lap), 'Stint': float(stint),
+                'PitOutTime': start + 20.0 if out_lap else np.nan,
+                'PitInTime': time - 2.0 if in_lap else np.nan,
+                'Sector1Time': sectors[0], 'Sector2Time': sectors[1], 'Sector3Time': sectors[2],
+                'IsPersonalBest': personal_best, 'Compound': compound, 'TyreLife': float(tyre_life),
+                'FreshTyre': True, 'Team': team, 'LapStartTime': start, 'TrackStatus': '1',
+                'Deleted': False, 'IsAccurate': not (in_lap or out_lap or lap == 1),
+            })
+            tyre_life += 1
+
+    laps = pd.DataFrame(rows)
+    for col in ('Time', 'LapTime', 'PitOutTime', 'PitInTime', 'Sector1Time', 'Sector2Time',
+                'Sector3Time', 'LapStartTime'):
+        laps[col] = pd.to_timedelta(laps[col], unit='s')
+    laps['Position'] = laps.groupby('LapNumber')['Time'].rank(method='first')
+    return laps.sort_values(['Driver', 'LapNumber']).reset_index(drop=True)
+
+
+def _make_results(laps, drivers):
+    last = laps.sort_values('LapNumber').groupby('Driver').tail(1)
+    order = last.sort_values(['LapNumber', 'Time'], ascending=[False, True])['Driver'].tolist()
+    max_laps = laps['LapNumber'].max()
+    laps_done = last.set_index('Driver')['LapNumber']
+    teams = {abbr: (number, team) for abbr, number, team in drivers}
+    return pd.DataFrame({
+        'DriverNumber': [teams[d][0] for d in order],
+        'Abbreviation': order,
+        'TeamName': [teams[d][1] for d in order],
+        'Position': np.arange(1, len(order) + 1, dtype=float),
+        'GridPosition': np.random.default_rng(1).permutation(len(order)) + 1.0,
+        'Status': ['Finished' if laps_done[d] == max_laps else 'Retired' for d in order],
+        'Points': [float(p) for p in ([25, 18, 15, 12, 10, 8, 6, 4, 2, 1] + [0] * 20)[:len(order)]],
+    })
+
+
+class SyntheticSession:
+    """
+    Stand-in for a loaded FastF1 race session with n_drivers and n_laps.
+    """
+
+    def __init__(self, n_drivers=20, n_laps=78, seed=0, track_length=5000.0, samples_per_lap=800):
+        rng = np.random.default_rng(seed)
+        self.seed = seed
+        self.name = 'Race'
+        self.event = pd.Series({
+            'EventName': 'Synthetic Grand Prix',
+            'RoundNumber': 0,
+            'EventDate': pd.Timestamp('2024-01-01'),
+        })
+
+        self._track = _make_track(rng, track_length, samples_per_lap)
+        base_lap_time = float(np.sum(self._track.step / self._track.speed))
+        drivers = DRIVERS[:n_drivers]
+
+        laps = _make_laps(rng, drivers, n_laps, base_lap_time)
+        self.laps = fastf1.core.Laps(laps, session=self)
+        self.results = _make_results(laps, drivers)
+
+        idx = self._track.corner_idx
+        self._corners = pd.DataFrame({
+            'X': self._track.x[idx],
+            'Y': self._track.y[idx],
+            'Number': np.arange(1, len(idx) + 1),
+            'Letter': '',
+            'Angle': 0.0,
+            'Distance': self._track.distance[idx],
+        })
+
+    def get_circuit_info(self):
+        return SimpleNamespace(corners=self._corners)
+
+    def get_lap_telemetry(self, driver, lap_number):
+        """
+        Merged car/position telemetry for one lap, sampled on a jittered distance grid.
+        """
+        lap = self.laps[(self.laps['Driver'] == driver) & (self.laps['LapNumber'] == lap_number)]
+        if lap.empty:
+            return None
+        lap = lap.iloc[0]
+
+        track = self._track
+        rng = np.random.default_rng([self.seed, int(lap_number), *driver.encode()])
+        n = len(track.distance)
+        distance = np.sort((track.distance + rng.uniform(0, track.step.mean(), n)) % track.length)
+
+        # Scale the reference speed profile to this lap's lap time
+        profile_time = np.sum(track.step / track.speed)
+        scale = profile_time / lap['LapTime'].total_seconds()
+        speed = np.interp(distance, track.distance, track.speed, period=track.length) * scale
+        speed = speed * (1 + rng.normal(0, 0.004, n))
+        accel = np.interp(distance, track.distance, track.accel, period=track.length)
+
+        speed_kmh = speed * 3.6
+        gear = np.clip(np.searchsorted(GEAR_EDGES, speed_kmh, side='right'), 1, 8)
+        low, high = GEAR_EDGES[gear - 1], GEAR_EDGES[gear]
+        rpm = 9000 + 3000 * (speed_kmh - low) / (high - low)
+        brake = accel < -0.05
+        throttle = np.where(brake, 0.0, np.where(accel > 0.01, 100.0, 60.0))
+        throttle = np.where(speed_kmh > 0.97 * speed_kmh.max(), 100.0, throttle)
+
+        seconds = np.concatenate([[0.0], np.cumsum(np.diff(distance) / speed[:-1])])
+        start = lap['LapStartTime']
+        return pd.DataFrame({
+            'SessionTime': start + pd.to_timedelta(seconds, unit='s'),
+            'Time': pd.to_timedelta(seconds, unit='s'),
+            'RPM': rpm,
+            'Speed': speed_kmh,
+            'nGear': gear.astype(np.int64),
+            'Throttle': throttle,
+            'Brake': brake,
+            'DRS': np.zeros(n, dtype=np.int64),
+            'Source': 'interpolation',
+            'Distance': distance,
+            'RelativeDistance': distance / track.length,
+            'Status': 'OnTrack',
+            'X': np.interp(distance, track.distance, track.x, period=track.length),
+            'Y': np.interp(distance, track.distance, track.y, period=track.length),
+            'Z': np.zeros(n),
+        })
+
+
+def make_session(n_drivers=20, n_laps=78, seed=0, register=True):
+    """
+    Build a SyntheticSession and register it with the data loader caches.
+    """
+    session = SyntheticSession(n_drivers=n_drivers, n_laps=n_laps, seed=seed)
+    if register:
+        from utils.data_loader import register_session
+        register_session(session, ('synthetic', seed, f"{n_drivers}x{n_laps}"))
+    return session
@@ -0,0 +1,166 @@
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+import pandas as pd
+from plotly.subplots import make_subplots
+from utils.data_loader import load_session_digests, session_label
+from utils.downsample import minmax_indices
+from utils.profiling import traced
+from components.strategy import TYRE_COLORS, CLEAN_LAP_FACTOR
+from components.performance import show_figure
+
+# Points per trace of the fastest-lap overlay
+COMPARISON_POINTS_PER_TRACE = 4000
+
+# Views of the comparison panel (only the selected one is computed)
+VIEWS = ["📈 Fastest Lap Telemetry", "⏱️ Lap Time Distribution", "🛞 Tyre Usage"]
+
+def build_comparison_telemetry_figure(digests):
+    """
+    Build the Speed and Throttle/Brake traces of each session's fastest lap,
+    overlaid against distance.
+    """
+    fig = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.06,
+        row_heights=[0.6, 0.4],
+        subplot_titles=("Speed", "Throttle & Brake")
+    )
+    for digest in digests:
+        lap = digest.fastest_lap
+        if lap is None:
+            continue
+        name = f"{digest.label} ({digest.summary.fastest_driver})"
+        for row, channel, scale, dash in ((1, 'Speed', 1, 'solid'), (2, 'Throttle', 1, 'solid'), (2, 'Brake', 100, 'dot')):
+            if channel not in lap.channels:
+                continue
+            values = lap.channels[channel][0] * scale
+            idx = minmax_indices(values, COMPARISON_POINTS_PER_TRACE)
+            fig.add_trace(
+                go.Scatter(x=lap.distance[idx], y=values[idx], mode='lines', name=f"{name} {channel}",
+                           legendgroup=digest.label, line=dict(dash=dash)),
+                row=row, col=1
+            )
+
+    fig.update_layout(
+        height=700,
+        template="plotly_dark",
+        hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    fig.update_yaxes(title_text="Speed (km/h)", row=1, col=1)
+    fig.update_yaxes(title_text="Input (%)", row=2, col=1)
+    fig.update_xaxes(title_text="Distance (m)", row=2, col=1)
+    return fig
+
+def build_comparison_pace_figure(digests):
+    """
+    Build the box plot of each session's clean lap times (laps within
+    CLEAN_LAP_FACTOR of that session's fastest lap).
+    """
+    frames = []
+    for digest in digests:
+        fastest = digest.summary.fastest_lap_time
+        if fastest is None:
+            continue
+        laps = digest.lap_times[digest.lap_times['LapTimeSeconds'] < fastest * CLEAN_LAP_FACTOR]
+        frames.append(pd.DataFrame({
+            'Session': digest.label,
+            'Driver': laps['Driver'].astype(str),
+            'LapTimeSeconds': laps['LapTimeSeconds']
+        }))
+    clean_laps = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['Session', 'Driver', 'LapTimeSeconds'])
+
+    fig = px.box(
+        clean_laps,
+        x="Session",
+        y="LapTimeSeconds",
+        color="Session",
+        hover_data=['Driver'],
+        title="Lap Time Distribution (Clean Laps)"
+    )
+    fig.update_layout(
+        yaxis_title="Lap Time (s)",
+        template="plotly_dark",
+        height=500,
+        showlegend=False
+    )
+    return fig
+
+def build_comparison_stints_figure(digests):
+    """
+    Build the stacked bar of laps run on each compound per session.
+    """
+    usage = pd.concat(
+        [digest.summary.stints.groupby('Compound', observed=True)['LapsRun'].sum().reset_index().assign(Session=digest.label)
+         for digest in digests],
+        ignore_index=True
+    )
+    fig = px.bar(
+        usage,
+        x="Session",
+        y="LapsRun",
+        color="Compound",
+        color_discrete_map=TYRE_COLORS,
+        title="Laps per Compound"
+    )
+    fig.update_layout(
+        yaxis_title="Laps",
+        template="plotly_dark",
+        height=500,
+        barmode="stack"
+    )
+    return fig
+
+def _summary_table(digests):
+    return pd.DataFrame({
+        'Session': [digest.label for digest in digests],
+        'Fastest Lap': [digest.summary.fastest_lap_time for digest in digests],
+        'Driver': [digest.summary.fastest_driver for digest in digests],
+        'Lap': [digest.summary.fastest_lap_number for digest in digests],
+        'Laps': [digest.summary.lap_count for digest in digests],
+        'Drivers': [len(digest.summary.drivers) for digest in digests],
+    })
+
+@traced()
+def render_session_comparison(keys):
+    """
+    Render the multi-session comparison: a summary row per session and one
+    overlay chart. The sessions are loaded concurrently and reduced to
+    cached SessionDigests, so no full session has to stay in memory.
+    """
+    st.markdown("### 🔀 Session Comparison")
+
+    with st.spinner(f"Loading {len(keys)} sessions..."):
+        loaded = load_session_digests(keys)
+
+    failed = [session_label(key) for key, digest in zip(keys, loaded) if digest is None]
+    if failed:
+        st.warning(f"Could not load: {', '.join(failed)}")
+    digests = [digest for digest in loaded if digest is not None]
+    if not digests:
+        st.error("None of the selected sessions could be loaded.")
+        return
+
+    st.dataframe(
+        _summary_table(digests),
+        hide_index=True,
+        width="stretch",
+        column_config={
+            'Fastest Lap': st.column_config.NumberColumn(format="%.3f s"),
+            'Lap': st.column_config.NumberColumn(format="%d"),
+        }
+    )
+
+    view = st.radio("View", VIEWS, horizontal=True, label_visibility="collapsed", key="comparison_view")
+    try:
+        if view == VIEWS[0]:
+            fig = build_comparison_telemetry_figure(digests)
+        elif view == VIEWS[1]:
+            fig = build_comparison_pace_figure(digests)
+        else:
+            fig = build_comparison_stints_figure(digests)
+        show_figure(fig)
+    except Exception as e:
+        st.error(f"Error generating comparison chart: {e}")
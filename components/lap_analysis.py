@@ -1,146 +1,213 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
+from utils.data_loader import ensure_session_data, load_laps, load_gap_engine, load_session_summary, load_lap_table
+from utils.lap_table import LAP_TABLE_COLUMNS, lap_table_page
+from utils.profiling import span, traced
+from components.performance import show_figure
 
-def render_lap_analysis(session, selected_drivers):
+# Session data this component needs, see utils.data_loader.SESSION_PARTS
+REQUIRED_DATA = ('laps',)
+
+# Views of the lap analysis panel (only the selected one is computed)
+VIEWS = ["📈 Position Chart", "⚔️ Gap Analysis", "⏱️ Lap Data"]
+
+# Rows per page of the lap data explorer
+LAP_TABLE_PAGE_SIZE = 50
+
+# Gap references of the gap analysis view (see build_gap_figure)
+GAP_MODES = ["Reference Driver", "Leader", "Car Ahead"]
+
+@traced()
+def render_lap_analysis(session, selected_drivers, selected_laps=None):
     """
-    Render lap analysis charts (Position Changes, Lap Times).
+    Render lap analysis charts (Position Changes, Lap Times) for the selected lap range.
+    Only the selected view is computed.
     """
     st.markdown("### 🏁 Race Progression & Laps")
+    ensure_session_data(session, *REQUIRED_DATA)
     
-    tab1, tab2, tab3 = st.tabs(["📈 Position Chart", "⚔️ Gap Analysis", "⏱️ Lap Data"])
+    # A radio instead of st.tabs: tabs compute every panel on each rerun,
+    # even the hidden ones
+    view = st.radio("View", VIEWS, horizontal=True, label_visibility="collapsed", key="lap_analysis_view")
     
-    with tab1:
-        render_position_chart(session, selected_drivers)
-        
-    with tab2:
-        render_gap_analysis(session, selected_drivers)
-        
-    with tab3:
-        render_lap_data_table(session, selected_drivers)
+    if view == VIEWS[0]:
+        render_position_chart(session, selected_drivers, selected_laps)
+    elif view == VIEWS[1]:
+        render_gap_analysis(session, selected_drivers, selected_laps)
+    else:
+        render_lap_data_table(session, selected_drivers, selected_laps)
+
+def build_gap_figure(session, selected_drivers, gap_mode="Reference Driver", selected_laps=None):
+    """
+    Build the gap chart of the selected drivers; gap_mode is one of GAP_MODES.
+    """
+    # Gaps come from the session's lap x driver time matrix (built once
+    # per session) rather than a merge per driver pair
+    engine = load_gap_engine(session, selected_laps)
+
+    if gap_mode == "Reference Driver":
+        # Reference driver is the first selected driver
+        # Positive gap means Ref is ahead (Driver 2 time > Ref time)
+        ref_driver = selected_drivers[0]
+        drivers = selected_drivers[1:]
+        gaps = engine.gap_to_reference(ref_driver)
+        title = f"Gap to {ref_driver} (Positive = {ref_driver} is Ahead)"
+        trace_name = f"Gap: {ref_driver} vs {{driver}}"
+    elif gap_mode == "Leader":
+        drivers = selected_drivers
+        gaps = engine.gap_to_leader()
+        title = "Gap to Leader"
+        trace_name = "{driver}"
+    else:
+        drivers = selected_drivers
+        gaps = engine.interval_to_car_ahead()
+        title = "Interval to Car Ahead"
+        trace_name = "{driver}"
 
-def render_gap_analysis(session, selected_drivers):
+    fig = go.Figure()
+
+    for driver in drivers:
+        if driver not in gaps.columns:
+            continue
+        gap = gaps[driver].dropna()
+
+        fig.add_trace(go.Scatter(
+            x=gap.index, 
+            y=gap.values, 
+            mode='lines+markers', 
+            name=trace_name.format(driver=driver)
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Lap Number",
+        yaxis_title="Gap (s)",
+        template="plotly_dark",
+        height=500,
+        hovermode="x unified"
+    )
+    return fig
+
+@traced()
+def render_gap_analysis(session, selected_drivers, selected_laps=None):
     """
     Render gap analysis (time delta) between drivers.
     """
-    if len(selected_drivers) < 2:
+    gap_mode = st.radio("Gap To", GAP_MODES, horizontal=True, key="gap_mode")
+
+    if gap_mode == "Reference Driver" and len(selected_drivers) < 2:
         st.info("Select at least two drivers to compare gaps.")
         return
+    if not selected_drivers:
+        st.info("Select drivers to compare gaps.")
+        return
         
     with st.spinner("Calculating gaps..."):
         try:
-            # Reference driver is the first selected driver
-            ref_driver = selected_drivers[0]
-            others = selected_drivers[1:]
-            
-            laps = session.laps
-            
-            fig = go.Figure()
-            
-            for driver in others:
-                # Calculate gap
-                # This is a simplified gap calculation. 
-                # FastF1 doesn't have a direct "Gap to Leader" for every lap easily accessible without some processing.
-                # We will use the accumulated lap times to calculate the gap at the end of each lap.
-                
-                d1_laps = laps.pick_drivers(ref_driver)
-                d2_laps = laps.pick_drivers(driver)
-                
-                # Merge on LapNumber
-                merged = pd.merge(d1_laps[['LapNumber', 'Time']], d2_laps[['LapNumber', 'Time']], on='LapNumber', suffixes=(f'_{ref_driver}', f'_{driver}'))
-                
-                # Calculate gap (Time delta)
-                # Positive gap means Ref is ahead (Driver 2 time > Ref time)
-                # Negative gap means Ref is behind
-                merged['Gap'] = (merged[f'Time_{driver}'] - merged[f'Time_{ref_driver}']).dt.total_seconds()
-                
-                fig.add_trace(go.Scatter(
-                    x=merged['LapNumber'], 
-                    y=merged['Gap'], 
-                    mode='lines+markers', 
-                    name=f"Gap: {ref_driver} vs {driver}"
-                ))
-            
-            fig.update_layout(
-                title=f"Gap to {ref_driver} (Positive = {ref_driver} is Ahead)",
-                xaxis_title="Lap Number",
-                yaxis_title="Gap (s)",
-                template="plotly_dark",
-                height=500,
-                hovermode="x unified"
-            )
+            fig = build_gap_figure(session, selected_drivers, gap_mode, selected_laps)
             
-            st.plotly_chart(fig, width="stretch")
+            show_figure(fig)
             
         except Exception as e:
             st.error(f"Error calculating gaps: {e}")
 
-def render_position_chart(session, selected_drivers):
+def build_position_figure(session, selected_drivers, selected_laps=None):
+    """
+    Build the position chart of the selected drivers (the top 10 finishers if none).
+    """
+    # Get the laps in the selected range
+    laps = load_laps(session, selected_laps)
+
+    # Filter for selected drivers if any, otherwise show all (or top 10 for clarity)
+    if selected_drivers:
+        drivers_to_show = selected_drivers
+    else:
+        # Default to top 10 finishers if no drivers selected
+        drivers_to_show = load_session_summary(session).finishing_order[:10]
+
+    # Filter laps
+    laps_filtered = laps[laps['Driver'].isin(drivers_to_show)]
+
+    # Create the plot
+    fig = px.line(
+        laps_filtered, 
+        x='LapNumber', 
+        y='Position', 
+        color='Driver', 
+        markers=True,
+        title="Position Changes over Race",
+        labels={'LapNumber': 'Lap', 'Position': 'Position'}
+    )
+
+    # Invert Y axis so P1 is at the top
+    fig.update_yaxes(autorange="reversed")
+
+    fig.update_layout(
+        template="plotly_dark",
+        height=500,
+        hovermode="x unified"
+    )
+    return fig
+
+@traced()
+def render_position_chart(session, selected_drivers, selected_laps=None):
     """
     Render a position chart (bumphart) for all drivers or selected drivers.
     """
     with st.spinner("Generating position chart..."):
         try:
-            # Get all laps
-            laps = session.laps
-            
-            # Filter for selected drivers if any, otherwise show all (or top 10 for clarity)
-            if selected_drivers:
-                drivers_to_show = selected_drivers
-            else:
-                # Default to top 10 finishers if no drivers selected
-                drivers_to_show = session.results['Abbreviation'].iloc[:10].tolist()
-            
-            # Filter laps
-            laps_filtered = laps[laps['Driver'].isin(drivers_to_show)]
+            fig = build_position_figure(session, selected_drivers, selected_laps)
             
-            # Create the plot
-            fig = px.line(
-                laps_filtered, 
-                x='LapNumber', 
-                y='Position', 
-                color='Driver', 
-                markers=True,
-                title="Position Changes over Race",
-                labels={'LapNumber': 'Lap', 'Position': 'Position'}
-            )
-            
-            # Invert Y axis so P1 is at the top
-            fig.update_yaxes(autorange="reversed")
-            
-            fig.update_layout(
-                template="plotly_dark",
-                height=500,
-                hovermode="x unified"
-            )
-            
-            st.plotly_chart(fig, width="stretch")
+            show_figure(fig)
             
         except Exception as e:
             st.error(f"Error generating position chart: {e}")
 
-def render_lap_data_table(session, selected_drivers):
+@traced()
+def render_lap_data_table(session, selected_drivers, selected_laps=None):
     """
-    Render a dataframe of lap data.
+    Render a paginated explorer of lap data; filtering, sorting and paging
+    happen on the server so only the visible page is sent to the browser.
     """
     try:
-        laps = session.laps
-        
-        if selected_drivers:
-            laps = laps[laps['Driver'].isin(selected_drivers)]
-            
-        # Select relevant columns
-        cols = ['Driver', 'LapNumber', 'LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time', 'Compound', 'TyreLife']
-        
-        # Format times for display
-        display_laps = laps[cols].copy()
-        
-        # Convert Timedelta to string for better display
-        for col in ['LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time']:
-            display_laps[col] = display_laps[col].apply(lambda x: str(x).split('days')[-1].strip() if pd.notnull(x) else '')
+        # Formatted once per session; compounds and stints come from the summary
+        table = load_lap_table(session)
+        stints = load_session_summary(session).stints
+
+        col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+        with col1:
+            compounds = st.multiselect("Compound", sorted(stints['Compound'].astype(str).unique()), key="lap_table_compounds")
+        with col2:
+            stint_numbers = st.multiselect("Stint", sorted(stints['Stint'].dropna().astype(int).unique()), key="lap_table_stints")
+        with col3:
+            sort_by = st.selectbox("Sort By", LAP_TABLE_COLUMNS, index=LAP_TABLE_COLUMNS.index('LapNumber'), key="lap_table_sort")
+        with col4:
+            descending = st.checkbox("Descending", key="lap_table_descending")
+
+        page = st.number_input("Page", min_value=1, value=1, step=1, key="lap_table_page")
+        rows, total = lap_table_page(
+            table,
+            drivers=selected_drivers or None,
+            compounds=compounds,
+            stints=stint_numbers,
+            lap_range=selected_laps,
+            sort_by=sort_by,
+            ascending=not descending,
+            page=page - 1,
+            page_size=LAP_TABLE_PAGE_SIZE
+        )
+
+        if not total:
+            st.info("No laps match the filters.")
+            return
+        pages = -(-total // LAP_TABLE_PAGE_SIZE)
+        first = (min(page, pages) - 1) * LAP_TABLE_PAGE_SIZE
+        st.caption(f"Rows {first + 1}–{first + len(rows)} of {total} · page {min(page, pages)} of {pages}")
 
-        st.dataframe(display_laps, use_container_width=True)
+        with span('dataframe') as table_span:
+            table_span.payload(rows)
+            st.dataframe(rows, hide_index=True, width="stretch")
         
     except Exception as e:
         st.error(f"Error displaying lap data: {e}")
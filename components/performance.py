@@ -0,0 +1,106 @@
+import functools
+import streamlit as st
+from utils.profiling import flatten, span, to_jsonl, run_active, start_run, end_run
+
+# Fragment-only reruns kept for the panel, newest first
+FRAGMENT_RUN_HISTORY = 10
+
+def profiled_fragment(func, **fragment_kwargs):
+    """
+    st.fragment(func) whose fragment-only reruns are profiled as runs of their
+    own; during a full rerun the fragment is part of that rerun's spans.
+    """
+    @functools.wraps(func)
+    def body(*args, **kwargs):
+        if run_active() or not st.session_state.get('profiling_enabled'):
+            return func(*args, **kwargs)
+        start_run(f"fragment:{func.__name__}")
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            run = end_run()
+            runs = st.session_state.setdefault('fragment_runs', [])
+            runs.insert(0, run)
+            del runs[FRAGMENT_RUN_HISTORY:]
+        # The sidebar panel only refreshes on full reruns
+        st.caption(f"⏱️ Fragment rerun took {run.duration * 1000:.0f} ms")
+        return result
+
+    return st.fragment(body, **fragment_kwargs)
+
+def show_figure(fig):
+    """
+    Render a Plotly figure full width, timed as a 'plotly_chart' span.
+    """
+    with span('plotly_chart') as chart_span:
+        chart_span.payload(fig)
+        st.plotly_chart(fig, width="stretch")
+
+def render_performance_toggle():
+    """
+    Render the sidebar switch that enables span collection for the following reruns.
+    """
+    st.sidebar.markdown("---")
+    return st.sidebar.checkbox("Show Performance Panel", key="profiling_enabled")
+
+def render_performance_panel(run):
+    """
+    Render the span tree of the current rerun, or of a recent fragment-only
+    rerun, (durations, payload sizes) in the sidebar.
+    """
+    if run is None:
+        return
+
+    # Imported here so the (usually hidden) panel adds nothing to startup
+    import pandas as pd
+    from utils.data_loader import get_session_pool_stats, get_telemetry_cache_stats, get_compaction_stats, PREFETCHER
+
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        # The current full rerun, or one of the recent fragment-only reruns
+        runs = [run] + st.session_state.get('fragment_runs', [])
+        if len(runs) > 1:
+            index = st.selectbox(
+                "Run",
+                range(len(runs)),
+                format_func=lambda i: "Full rerun" if i == 0 else f"{runs[i].name} ({runs[i].attrs['started_at'][11:]})",
+                key="profiling_run"
+            )
+            run = runs[index]
+        st.caption(f"{'Rerun' if run is runs[0] else run.name} took {run.duration * 1000:.0f} ms")
+
+        rows = flatten(run)
+        spans = pd.DataFrame({
+            'Span': ['  ' * row['depth'] + row['name'] for row in rows],
+            'ms': [round(row['duration_ms'], 1) if row['duration_ms'] is not None else None for row in rows],
+            'Payload (KB)': [round(row['payload_bytes'] / 1024, 1) if row['payload_bytes'] else None for row in rows],
+            'Details': [', '.join(f"{k}={v}" for k, v in row['attrs'].items() if k != 'started_at') for row in rows],
+        })
+        st.dataframe(spans, hide_index=True, width="stretch")
+
+        pool = get_session_pool_stats()
+        telemetry = get_telemetry_cache_stats()
+        st.caption(
+            f"Session pool: {pool['entries']} sessions, {pool['bytes'] / 1024 ** 2:.0f} MB, "
+            f"hit rate {pool['hit_rate']:.0%} · Telemetry cache: {telemetry['entries']} laps, "
+            f"hit rate {telemetry['hit_rate']:.0%}"
+        )
+
+        prefetch = PREFETCHER.stats()
+        st.caption(
+            f"Prefetch: {prefetch['running']} running, {prefetch['queued']} queued, "
+            f"{prefetch['completed']} done, {prefetch['failed']} failed, {prefetch['cancelled']} cancelled"
+        )
+
+        compaction = get_compaction_stats()
+        if compaction['bytes_before']:
+            st.caption(
+                f"Compact dtypes: {compaction['bytes_before'] / 1024 ** 2:.0f} MB → "
+                f"{compaction['bytes_after'] / 1024 ** 2:.0f} MB across {compaction['sessions']} loads"
+            )
+
+        st.download_button(
+            "Export Spans (JSON Lines)",
+            to_jsonl(run),
+            file_name="spans.jsonl",
+            mime="application/jsonl"
+        )
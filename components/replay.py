@@ -0,0 +1,153 @@
+import time
+import streamlit as st
+import plotly.graph_objects as go
+import pandas as pd
+from utils.data_loader import ensure_session_data, load_replay_timeline, load_session_summary, session_key
+from utils.processing import RaceReplay
+from utils.profiling import span, traced
+from components.strategy import CLEAN_LAP_FACTOR, stint_timeline_figure, lap_time_box_figure
+from components.performance import show_figure
+
+# Session data this component needs, see utils.data_loader.SESSION_PARTS
+REQUIRED_DATA = ('laps',)
+
+# Seconds between laps while playing (the replay fragment's run_every)
+REPLAY_TICK_SECONDS = 1.0
+
+# Views of the replay panel (only the selected one is computed)
+VIEWS = ["📈 Positions", "⚔️ Gap to Leader", "🛞 Tyre Stints", "⏱️ Lap Times"]
+
+def replay_run_every():
+    """
+    run_every for the replay fragment: a tick per lap while playing, none otherwise.
+    """
+    return REPLAY_TICK_SECONDS if st.session_state.get('replay_playing') else None
+
+def _get_replay(session):
+    # Each browser session has its own cursor over the shared timeline
+    key = session_key(session)
+    state = st.session_state.get('replay')
+    if state is None or state[0] != key:
+        state = (key, RaceReplay(load_replay_timeline(session)))
+        st.session_state['replay'] = state
+    return state[1]
+
+def _set_playing(playing):
+    # The fragment's run_every is fixed when the page runs, so a change
+    # needs a full rerun
+    if st.session_state.get('replay_playing', False) != playing:
+        st.session_state['replay_playing'] = playing
+        st.rerun()
+
+def build_replay_figure(session, replay, view, drivers):
+    """
+    Build the chart of a replay view from the replay's running state, with the
+    lap axis fixed to the whole session.
+    """
+    timeline = replay.timeline
+    laps = timeline.lap_numbers[:replay.lap]
+    columns = [timeline.drivers.index(driver) for driver in drivers if driver in timeline.drivers]
+    lap_axis = [timeline.lap_numbers[0] - 0.5, timeline.lap_numbers[-1] + 0.5] if len(timeline.lap_numbers) else None
+
+    if view == VIEWS[2]:
+        stints = replay.stint_table()
+        fig = stint_timeline_figure(stints[stints['Driver'].isin(drivers)], len(drivers))
+        fig.update_xaxes(range=lap_axis)
+        return fig
+
+    if view == VIEWS[3]:
+        threshold = load_session_summary(session).fastest_lap_time * CLEAN_LAP_FACTOR
+        clean_laps = pd.DataFrame(
+            [(timeline.drivers[d], lap_time) for d in columns for lap_time in replay.lap_times[d] if lap_time < threshold],
+            columns=['Driver', 'LapTimeSeconds']
+        )
+        return lap_time_box_figure(clean_laps)
+
+    values, title, y_title = (
+        (replay.positions(), "Positions", "Position") if view == VIEWS[0]
+        else (replay.gap_to_leader[:replay.lap], "Gap to Leader", "Gap (s)")
+    )
+    fig = go.Figure()
+    for d in columns:
+        fig.add_trace(go.Scatter(x=laps, y=values[:, d], mode='lines+markers', name=timeline.drivers[d]))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Lap Number",
+        yaxis_title=y_title,
+        template="plotly_dark",
+        height=500,
+        hovermode="x unified",
+        xaxis=dict(range=lap_axis)
+    )
+    if view == VIEWS[0]:
+        fig.update_yaxes(autorange="reversed")
+    return fig
+
+@traced()
+def render_race_replay(session, selected_drivers):
+    """
+    Render the lap-by-lap race replay: step/play controls, the classification
+    after the current lap and one chart of the replayed laps.
+    Every step only appends the new lap to the replay's running state.
+    """
+    st.markdown("### ⏯️ Race Replay")
+    if not st.toggle("Replay Mode", key="replay_enabled"):
+        _set_playing(False)
+        return
+
+    ensure_session_data(session, *REQUIRED_DATA)
+    replay = _get_replay(session)
+    playing = st.session_state.get('replay_playing', False)
+
+    col1, col2, col3, col4 = st.columns(4)
+    if col1.button("⏮️ Reset", key="replay_reset", width="stretch"):
+        replay.reset()
+        _set_playing(False)
+    if col2.button("◀️ Back", key="replay_back", width="stretch"):
+        # Rewinding replays from the first lap
+        replay.seek(max(0, replay.lap - 1))
+    if col3.button("Step ▶️", key="replay_step", width="stretch"):
+        replay.step()
+    if col4.button("⏸️ Pause" if playing else "▶️ Play", key="replay_play", width="stretch"):
+        _set_playing(not playing and not replay.finished)
+    elif playing:
+        # Timer tick: advance one lap, unless a control rerun came in between
+        now = time.monotonic()
+        if now - st.session_state.get('replay_last_tick', 0.0) >= REPLAY_TICK_SECONDS * 0.9:
+            with span('replay_step', lap=replay.lap + 1):
+                replay.step()
+            st.session_state['replay_last_tick'] = now
+        if replay.finished:
+            _set_playing(False)
+
+    total = len(replay.timeline.lap_numbers)
+    st.progress(replay.lap / total if total else 0.0, text=f"Lap {replay.lap_number or 0} of {total}")
+    if not replay.lap:
+        st.info("Press Step or Play to start the replay.")
+        return
+
+    drivers = selected_drivers or replay.timeline.drivers
+    col_left, col_right = st.columns([1, 2])
+    with col_left:
+        standings = replay.standings()
+        with span('dataframe') as table_span:
+            table_span.payload(standings)
+            st.dataframe(
+                standings,
+                hide_index=True,
+                width="stretch",
+                column_config={
+                    'Position': st.column_config.NumberColumn(format="%d"),
+                    'Gap': st.column_config.NumberColumn(format="+%.3f"),
+                    'Interval': st.column_config.NumberColumn(format="+%.3f"),
+                    'TyreLife': st.column_config.NumberColumn(format="%d"),
+                    'LastLap': st.column_config.NumberColumn(format="%.3f"),
+                }
+            )
+    with col_right:
+        view = st.radio("View", VIEWS, horizontal=True, label_visibility="collapsed", key="replay_view")
+        try:
+            fig = build_replay_figure(session, replay, view, drivers)
+            show_figure(fig)
+        except Exception as e:
+            st.error(f"Error generating replay chart: {e}")
@@ -1,46 +1,123 @@
+import uuid
 import streamlit as st
-from utils.data_loader import load_session
+from utils.profiling import traced
 
+# The sidebar and the first panels only need lap timing (which also loads the
+# race control messages, see PART_DEPENDENCIES); telemetry is pulled in
+# lazily by the components that draw it
+INITIAL_PARTS = ('laps',)
+
+# Sessions offered in the sidebar (also enumerated by warm_cache.py)
+YEARS = [2024, 2023, 2022, 2021]
+CIRCUITS = ["Bahrain", "Saudi Arabia", "Australia", "Japan", "China", "Miami", "Emilia Romagna", "Monaco", "Canada", "Spain", "Austria", "Great Britain", "Hungary", "Belgium", "Netherlands", "Italy", "Azerbaijan", "Singapore", "USA", "Mexico", "Brazil", "Las Vegas", "Qatar", "Abu Dhabi"]
+SESSION_TYPES = ["FP1", "FP2", "FP3", "Qualifying", "Race", "Sprint"]
+
+# Sidebar modes: one session in depth, or several sessions overlaid
+MODES = ["Single Session", "Compare Sessions"]
+MAX_COMPARED_SESSIONS = 8
+
+def _load_session(year, gp, session_type):
+    # The data layer (pandas, FastF1) is only imported once a session is
+    # requested, so the landing page does not wait for it
+    from utils.data_loader import load_session
+    return load_session(year, gp, session_type, parts=INITIAL_PARTS)
+
+# Sidebar markers for sessions that open quickly (see session_warmth)
+WARMTH_MARKERS = {'memory': "⚡", 'disk': "💾", 'loading': "⏳"}
+
+def _prefetch_related(year, gp, session_type):
+    from utils.data_loader import prefetch_related
+    # The prefetcher is shared by every browser session; each one only
+    # replaces its own queued prefetches
+    requester = st.session_state.setdefault('prefetch_requester', uuid.uuid4().hex)
+    prefetch_related(year, gp, session_type, requester)
+
+def render_warm_sessions(year, gp):
+    """
+    List the sessions of the selected event that are already loaded, cached or being prefetched.
+    """
+    from utils.data_loader import session_warmth
+    warm = []
+    for session_type in SESSION_TYPES:
+        marker = WARMTH_MARKERS.get(session_warmth(year, gp, session_type))
+        if marker:
+            warm.append(f"{marker} {session_type}")
+    if warm:
+        st.sidebar.caption("Ready: " + " · ".join(warm))
+
+def render_comparison_selection():
+    """
+    Render the session pickers of the comparison mode. Returns {'comparison': keys},
+    with keys None until the user starts a comparison.
+    """
+    years = st.sidebar.multiselect("Years", YEARS, default=YEARS[:1], key="compare_years")
+    gp = st.sidebar.selectbox("Grand Prix", CIRCUITS, index=7, key="compare_gp")
+    session_types = st.sidebar.multiselect("Sessions", SESSION_TYPES, default=["Qualifying", "Race"], key="compare_sessions")
+
+    keys = [(year, gp, session_type) for year in sorted(years) for session_type in session_types]
+    if len(keys) > MAX_COMPARED_SESSIONS:
+        st.sidebar.warning(f"Comparing the first {MAX_COMPARED_SESSIONS} of {len(keys)} sessions.")
+        keys = keys[:MAX_COMPARED_SESSIONS]
+
+    if st.sidebar.button("Compare Sessions", type="primary", disabled=not keys):
+        st.session_state['comparison_keys'] = keys
+    return {'comparison': st.session_state.get('comparison_keys')}
+
+@traced()
 def render_sidebar():
     """
-    Render the sidebar controls and return the selected parameters and loaded session.
+    Render the sidebar controls and return the selected parameters and loaded
+    session (or the sessions to compare in comparison mode).
     """
     st.sidebar.title("F1 Analytics 🏎️")
+    mode = st.sidebar.radio("Mode", MODES, horizontal=True, label_visibility="collapsed", key="sidebar_mode")
     st.sidebar.header("Session Selection")
+    if mode == MODES[1]:
+        return render_comparison_selection()
 
     # Year Selector
-    year = st.sidebar.selectbox("Year", [2024, 2023, 2022, 2021], index=0)
+    year = st.sidebar.selectbox("Year", YEARS, index=0)
 
     # Grand Prix Selector
-    circuits = ["Bahrain", "Saudi Arabia", "Australia", "Japan", "China", "Miami", "Emilia Romagna", "Monaco", "Canada", "Spain", "Austria", "Great Britain", "Hungary", "Belgium", "Netherlands", "Italy", "Azerbaijan", "Singapore", "USA", "Mexico", "Brazil", "Las Vegas", "Qatar", "Abu Dhabi"]
-    gp = st.sidebar.selectbox("Grand Prix", circuits, index=7) # Default to Monaco
+    gp = st.sidebar.selectbox("Grand Prix", CIRCUITS, index=7) # Default to Monaco
 
     # Session Type Selector
-    session_type = st.sidebar.selectbox("Session", ["FP1", "FP2", "FP3", "Qualifying", "Race", "Sprint"], index=4)
+    session_type = st.sidebar.selectbox("Session", SESSION_TYPES, index=4)
 
     # Load Data Button
     session = None
     if st.sidebar.button("Load Session Data", type="primary"):
         with st.spinner("Loading session data..."):
             try:
-                session = load_session(year, gp, session_type)
+                session = _load_session(year, gp, session_type)
                 if session:
-                    st.session_state['session'] = session
+                    # Only the pool key is kept per browser; the session itself is shared
+                    st.session_state['session_key'] = (year, gp, session_type)
                     st.success(f"Loaded {year} {gp} {session_type}")
+                    # Warm the rest of the weekend while the user looks at this one
+                    _prefetch_related(year, gp, session_type)
                 else:
                     st.error("Failed to load session.")
             except Exception as e:
                 st.error(f"Error: {e}")
     
-    # Retrieve session from state if available
-    if 'session' in st.session_state:
-        session = st.session_state['session']
-        
+    # Retrieve session from the shared pool if one was selected
+    if 'session_key' in st.session_state:
+        render_warm_sessions(year, gp)
+
+        session = _load_session(*st.session_state['session_key'])
+        if session is None:
+            return None
+
         st.sidebar.markdown("---")
         st.sidebar.header("Filter Controls")
         
+        # Drivers and lap count come from the session summary built at load time
+        from utils.data_loader import load_session_summary
+        summary = load_session_summary(session)
+
         # Driver Selector
-        drivers = sorted(session.results['Abbreviation'].unique())
+        drivers = summary.drivers
         
         all_drivers = st.sidebar.checkbox("Select All Drivers")
         if all_drivers:
@@ -51,8 +128,11 @@ def render_sidebar():
             selected_drivers = st.sidebar.multiselect("Select Drivers", drivers, default=drivers[:2], key="drivers_multiselect")
         
         # Lap Selector (Range)
-        total_laps = int(session.laps['LapNumber'].max())
+        total_laps = summary.lap_count
         selected_laps = st.sidebar.slider("Select Laps", 1, total_laps, (1, total_laps))
+
+        # Traces are downsampled for the browser unless full resolution is requested
+        full_resolution = st.sidebar.checkbox("Full Resolution Traces", value=False)
         
         return {
             "year": year,
@@ -60,7 +140,8 @@ def render_sidebar():
             "session_type": session_type,
             "session": session,
             "selected_drivers": selected_drivers,
-            "selected_laps": selected_laps
+            "selected_laps": selected_laps,
+            "full_resolution": full_resolution
         }
     
     return None
@@ -1,12 +1,34 @@
 import streamlit as st
 import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
+from utils.data_loader import ensure_session_data, load_laps, load_session_summary
+from utils.profiling import traced
+from components.performance import show_figure
 
-def render_strategy_charts(session, selected_drivers):
+# Session data this component needs, see utils.data_loader.SESSION_PARTS
+REQUIRED_DATA = ('laps',)
+
+# Color map for tyres
+TYRE_COLORS = {
+    'SOFT': '#FF3333',
+    'MEDIUM': '#FFFF33',
+    'HARD': '#E0E0E0',
+    'INTERMEDIATE': '#39B54A',
+    'WET': '#00AEEF',
+    'UNKNOWN': '#808080'
+}
+
+# Laps slower than this factor times the session's fastest lap are left out
+# of the lap time distribution (pit stops, safety car)
+CLEAN_LAP_FACTOR = 1.15
+
+# Views of the strategy panel (only the selected one is computed)
+VIEWS = ["📊 Tyre Stints", "⏱️ Lap Time Distribution"]
+
+@traced()
+def render_strategy_charts(session, selected_drivers, selected_laps=None):
     """
-    Render strategy charts: Tyre Stint History and Lap Time Distribution.
+    Render strategy charts: Tyre Stint History and Lap Time Distribution for the selected lap range.
+    Only the selected view is computed.
     """
     st.markdown("### 🛞 Strategy & Pace")
     
@@ -14,98 +36,112 @@ def render_strategy_charts(session, selected_drivers):
         st.warning("Select drivers to analyze strategy.")
         return
 
-    tab1, tab2 = st.tabs(["📊 Tyre Stints", "⏱️ Lap Time Distribution"])
+    ensure_session_data(session, *REQUIRED_DATA)
+
+    view = st.radio("View", VIEWS, horizontal=True, label_visibility="collapsed", key="strategy_view")
     
-    with tab1:
-        render_tyre_stints(session, selected_drivers)
-        
-    with tab2:
-        render_lap_time_distribution(session, selected_drivers)
+    if view == VIEWS[0]:
+        render_tyre_stints(session, selected_drivers, selected_laps)
+    else:
+        render_lap_time_distribution(session, selected_drivers, selected_laps)
+
+def build_tyre_stints_figure(session, selected_drivers, selected_laps=None):
+    """
+    Build the tyre stint timeline of the selected drivers within selected_laps.
+    """
+    # The stint table is part of the session summary (built once per lap range)
+    stints = load_session_summary(session, selected_laps).stints
+    stints = stints[stints['Driver'].isin(selected_drivers)]
+    return stint_timeline_figure(stints, len(selected_drivers))
+
+def stint_timeline_figure(stints, n_drivers):
+    """
+    Build the tyre stint timeline from a stint table (Driver, Stint, Compound,
+    StartLap, EndLap, LapsRun).
+    """
+    fig = px.timeline(
+        stints, 
+        x_start="StartLap", 
+        x_end="EndLap", 
+        y="Driver", 
+        color="Compound",
+        color_discrete_map=TYRE_COLORS,
+        hover_data=['LapsRun'],
+        title="Tyre Stint History"
+    )
 
-def render_tyre_stints(session, selected_drivers):
+    fig.update_yaxes(categoryorder="total ascending")
+    fig.update_layout(
+        xaxis_title="Lap Number",
+        yaxis_title="Driver",
+        template="plotly_dark",
+        height=300 + (n_drivers * 20),
+        showlegend=True
+    )
+    return fig
+
+@traced()
+def render_tyre_stints(session, selected_drivers, selected_laps=None):
     """
     Render a horizontal bar chart showing tyre stints.
     """
     try:
-        laps = session.laps
-        drivers_laps = laps[laps['Driver'].isin(selected_drivers)].copy()
-        
-        # Group by Driver and Stint to get start and end laps
-        stints = drivers_laps.groupby(['Driver', 'Stint', 'Compound']).agg(
-            StartLap=('LapNumber', 'min'),
-            EndLap=('LapNumber', 'max'),
-            LapsRun=('LapNumber', 'count')
-        ).reset_index()
-        
-        # Color map for tyres
-        tyre_colors = {
-            'SOFT': '#FF3333',
-            'MEDIUM': '#FFFF33',
-            'HARD': '#E0E0E0',
-            'INTERMEDIATE': '#39B54A',
-            'WET': '#00AEEF',
-            'UNKNOWN': '#808080'
-        }
-        
-        fig = px.timeline(
-            stints, 
-            x_start="StartLap", 
-            x_end="EndLap", 
-            y="Driver", 
-            color="Compound",
-            color_discrete_map=tyre_colors,
-            hover_data=['LapsRun'],
-            title="Tyre Stint History"
-        )
+        fig = build_tyre_stints_figure(session, selected_drivers, selected_laps)
         
-        fig.update_yaxes(categoryorder="total ascending")
-        fig.update_layout(
-            xaxis_title="Lap Number",
-            yaxis_title="Driver",
-            template="plotly_dark",
-            height=300 + (len(selected_drivers) * 20),
-            showlegend=True
-        )
-        
-        st.plotly_chart(fig, width="stretch")
+        show_figure(fig)
         
     except Exception as e:
         st.error(f"Error generating tyre stints: {e}")
 
-def render_lap_time_distribution(session, selected_drivers):
+def build_lap_time_distribution_figure(session, selected_drivers, selected_laps=None):
+    """
+    Build the box plot of the selected drivers' clean lap times within selected_laps.
+    """
+    laps = load_laps(session, selected_laps)
+    drivers_laps = laps[laps['Driver'].isin(selected_drivers)].copy()
+
+    # Filter out slow laps (e.g., pit stops, safety car) for better visualization
+    # Using 107% rule or just a reasonable cutoff like 1.1 * median
+    # For simplicity, let's just remove outliers > 1.2 * fastest lap of the session
+    # The cutoff stays relative to the whole session, not the lap range
+    fastest_lap = load_session_summary(session).fastest_lap_time
+    threshold = fastest_lap * CLEAN_LAP_FACTOR
+
+    drivers_laps['LapTimeSeconds'] = drivers_laps['LapTime'].dt.total_seconds()
+    clean_laps = drivers_laps[drivers_laps['LapTimeSeconds'] < threshold]
+
+    return lap_time_box_figure(clean_laps)
+
+def lap_time_box_figure(clean_laps):
+    """
+    Build the lap time box plot from clean laps (Driver, LapTimeSeconds).
+    """
+    fig = px.box(
+        clean_laps, 
+        x="Driver", 
+        y="LapTimeSeconds", 
+        color="Driver",
+        title="Lap Time Distribution (Clean Laps)",
+        points="all"
+    )
+
+    fig.update_layout(
+        yaxis_title="Lap Time (s)",
+        template="plotly_dark",
+        height=500,
+        showlegend=False
+    )
+    return fig
+
+@traced()
+def render_lap_time_distribution(session, selected_drivers, selected_laps=None):
     """
     Render a box plot of lap times to show consistency.
     """
     try:
-        laps = session.laps
-        drivers_laps = laps[laps['Driver'].isin(selected_drivers)].copy()
-        
-        # Filter out slow laps (e.g., pit stops, safety car) for better visualization
-        # Using 107% rule or just a reasonable cutoff like 1.1 * median
-        # For simplicity, let's just remove outliers > 1.2 * fastest lap of the session
-        fastest_lap = laps.pick_fastest()['LapTime'].total_seconds()
-        threshold = fastest_lap * 1.15
-        
-        drivers_laps['LapTimeSeconds'] = drivers_laps['LapTime'].dt.total_seconds()
-        clean_laps = drivers_laps[drivers_laps['LapTimeSeconds'] < threshold]
-        
-        fig = px.box(
-            clean_laps, 
-            x="Driver", 
-            y="LapTimeSeconds", 
-            color="Driver",
-            title="Lap Time Distribution (Clean Laps)",
-            points="all"
-        )
-        
-        fig.update_layout(
-            yaxis_title="Lap Time (s)",
-            template="plotly_dark",
-            height=500,
-            showlegend=False
-        )
+        fig = build_lap_time_distribution_figure(session, selected_drivers, selected_laps)
         
-        st.plotly_chart(fig, width="stretch")
+        show_figure(fig)
         
     except Exception as e:
         st.error(f"Error generating lap time distribution: {e}")
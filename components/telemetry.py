@@ -1,12 +1,116 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils.data_loader import load_laps
+from utils.data_loader import load_telemetry_batch, load_lap_comparison, ensure_session_data
+from utils.downsample import downsample_frame, minmax_indices
+from utils.profiling import traced
+from components.performance import show_figure
 
 from plotly.subplots import make_subplots
 
-def render_telemetry_traces(session, selected_drivers):
+# Session data this component needs, see utils.data_loader.SESSION_PARTS
+REQUIRED_DATA = ('laps', 'telemetry')
+
+# Maximum number of points sent to the browser for the whole chart
+TELEMETRY_POINT_BUDGET = 40000
+TRACES_PER_DRIVER = 5
+
+def build_telemetry_figure(session, selected_drivers, full_resolution=False, selected_laps=None):
+    """
+    Build the telemetry traces (Speed, RPM, Throttle/Brake, delta time) of each
+    driver's fastest lap within selected_laps.
+    """
+    ensure_session_data(session, *REQUIRED_DATA)
+
+    # Fastest-lap telemetry for all drivers is extracted concurrently
+    laps = [(driver, None) for driver in selected_drivers]
+    telemetry = load_telemetry_batch(session, laps, lap_range=selected_laps)
+
+    # The same laps resampled onto a common distance grid (cached), for
+    # the delta trace
+    comparison = load_lap_comparison(session, laps, lap_range=selected_laps)
+    reference = comparison.labels[0] if comparison is not None else selected_drivers[0]
+
+    # Create subplots: Speed, RPM/Gear, Throttle/Brake, Delta
+    fig = make_subplots(
+        rows=4, cols=1, 
+        shared_xaxes=True,
+        vertical_spacing=0.05,
+        row_heights=[0.3, 0.25, 0.25, 0.2],
+        subplot_titles=("Speed", "RPM & Gear", "Throttle & Brake", f"Delta to {reference}")
+    )
+
+    max_rows = None if full_resolution else TELEMETRY_POINT_BUDGET // (TRACES_PER_DRIVER * len(selected_drivers))
+
+    for driver, tel in zip(selected_drivers, telemetry):
+        if tel is None:
+            continue
+        tel = downsample_frame(tel, max_rows, ['Speed', 'RPM', 'Throttle'])
+
+        # Speed Trace
+        fig.add_trace(
+            go.Scatter(x=tel['Distance'], y=tel['Speed'], mode='lines', name=f"{driver} Speed"),
+            row=1, col=1
+        )
+
+        # RPM Trace
+        fig.add_trace(
+            go.Scatter(x=tel['Distance'], y=tel['RPM'], mode='lines', name=f"{driver} RPM", opacity=0.7),
+            row=2, col=1
+        )
+
+        # Gear Trace (Secondary Y-axis logic is complex in subplots, so we might just overlay or use a separate chart if needed. 
+        # For now, let's just show RPM. Gear is discrete and might clutter.)
+        # Alternatively, we can scale Gear to fit or just show it on hover. 
+        # Let's add Gear as a separate step line if requested, but RPM is usually more useful for "traces".
+        # PRD asks for "Y-Axis 2 (RPM/Gear)". Let's try to add Gear on a secondary axis if possible, 
+        # but for simplicity in this grid, let's stick to RPM and maybe add Gear as text or color?
+        # Actually, let's just plot Gear on the same row but maybe scaled or just let the user toggle.
+        # Let's stick to RPM for now to keep it clean, or add Gear as a separate trace.
+
+        # Throttle & Brake
+        fig.add_trace(
+            go.Scatter(x=tel['Distance'], y=tel['Throttle'], mode='lines', name=f"{driver} Throttle", line=dict(dash='solid')),
+            row=3, col=1
+        )
+        fig.add_trace(
+            go.Scatter(x=tel['Distance'], y=tel['Brake'] * 100, mode='lines', name=f"{driver} Brake", line=dict(dash='dot')),
+            row=3, col=1
+        )
+
+    # Delta to reference (positive = slower than the reference lap)
+    if comparison is not None:
+        deltas = comparison.delta_time(reference)
+        for driver, delta in zip(comparison.labels, deltas):
+            if driver == reference:
+                continue
+            idx = minmax_indices(delta, max_rows // 2) if max_rows else slice(None)
+            fig.add_trace(
+                go.Scatter(x=comparison.distance[idx], y=delta[idx], mode='lines', name=f"{driver} Δ"),
+                row=4, col=1
+            )
+        fig.add_hline(y=0, line=dict(color='gray', dash='dot'), row=4, col=1)
+
+    fig.update_layout(
+        height=1000,
+        template="plotly_dark",
+        hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    fig.update_yaxes(title_text="Speed (km/h)", row=1, col=1)
+    fig.update_yaxes(title_text="RPM", row=2, col=1)
+    fig.update_yaxes(title_text="Input (%)", row=3, col=1)
+    fig.update_yaxes(title_text="Δ Time (s)", row=4, col=1)
+    fig.update_xaxes(title_text="Distance (m)", row=4, col=1)
+    return fig
+
+@traced()
+def render_telemetry_traces(session, selected_drivers, full_resolution=False, selected_laps=None):
     """
-    Render telemetry traces for selected drivers (Speed, RPM/Gear, Throttle/Brake).
+    Render telemetry traces for selected drivers (Speed, RPM/Gear, Throttle/Brake)
+    and their delta time to the first selected driver, using each driver's
+    fastest lap within the selected lap range.
+    Traces are downsampled to TELEMETRY_POINT_BUDGET unless full_resolution is set.
     """
     st.markdown("### 📈 Telemetry Traces")
     
@@ -16,64 +120,9 @@ def render_telemetry_traces(session, selected_drivers):
 
     with st.spinner("Generating telemetry traces..."):
         try:
-            # Create subplots: Speed, RPM/Gear, Throttle/Brake
-            fig = make_subplots(
-                rows=3, cols=1, 
-                shared_xaxes=True,
-                vertical_spacing=0.05,
-                subplot_titles=("Speed", "RPM & Gear", "Throttle & Brake")
-            )
-            
-            for driver in selected_drivers:
-                lap = session.laps.pick_drivers(driver).pick_fastest()
-                if lap is None:
-                    continue
-                tel = lap.get_telemetry()
-                
-                # Speed Trace
-                fig.add_trace(
-                    go.Scatter(x=tel['Distance'], y=tel['Speed'], mode='lines', name=f"{driver} Speed"),
-                    row=1, col=1
-                )
-                
-                # RPM Trace
-                fig.add_trace(
-                    go.Scatter(x=tel['Distance'], y=tel['RPM'], mode='lines', name=f"{driver} RPM", opacity=0.7),
-                    row=2, col=1
-                )
-                
-                # Gear Trace (Secondary Y-axis logic is complex in subplots, so we might just overlay or use a separate chart if needed. 
-                # For now, let's just show RPM. Gear is discrete and might clutter.)
-                # Alternatively, we can scale Gear to fit or just show it on hover. 
-                # Let's add Gear as a separate step line if requested, but RPM is usually more useful for "traces".
-                # PRD asks for "Y-Axis 2 (RPM/Gear)". Let's try to add Gear on a secondary axis if possible, 
-                # but for simplicity in this grid, let's stick to RPM and maybe add Gear as text or color?
-                # Actually, let's just plot Gear on the same row but maybe scaled or just let the user toggle.
-                # Let's stick to RPM for now to keep it clean, or add Gear as a separate trace.
-                
-                # Throttle & Brake
-                fig.add_trace(
-                    go.Scatter(x=tel['Distance'], y=tel['Throttle'], mode='lines', name=f"{driver} Throttle", line=dict(dash='solid')),
-                    row=3, col=1
-                )
-                fig.add_trace(
-                    go.Scatter(x=tel['Distance'], y=tel['Brake'] * 100, mode='lines', name=f"{driver} Brake", line=dict(dash='dot')),
-                    row=3, col=1
-                )
-
-            fig.update_layout(
-                height=800,
-                template="plotly_dark",
-                hovermode="x unified",
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            
-            fig.update_yaxes(title_text="Speed (km/h)", row=1, col=1)
-            fig.update_yaxes(title_text="RPM", row=2, col=1)
-            fig.update_yaxes(title_text="Input (%)", row=3, col=1)
-            fig.update_xaxes(title_text="Distance (m)", row=3, col=1)
+            fig = build_telemetry_figure(session, selected_drivers, full_resolution, selected_laps)
             
-            st.plotly_chart(fig, width="stretch")
+            show_figure(fig)
             
         except Exception as e:
             st.error(f"Error generating telemetry: {e}")
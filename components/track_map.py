@@ -1,19 +1,160 @@
 import streamlit as st
-import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-from utils.data_loader import load_laps
+from plotly.colors import qualitative
+from utils.data_loader import load_racing_line, load_circuit_corners, load_mini_sectors, ensure_session_data
+from utils.profiling import traced
+from components.performance import show_figure
 
-def render_track_map(session, selected_drivers, color_by='Speed'):
+# Session data this component needs, see utils.data_loader.SESSION_PARTS
+REQUIRED_DATA = ('laps', 'telemetry')
+
+# Maximum number of racing line points sent to the browser
+TRACK_MAP_POINT_BUDGET = 3000
+
+# Colouring options: channel -> (label, colorscale, fixed colour range)
+COLOR_OPTIONS = {
+    'Speed': ('Speed', 'Viridis', None),
+    'nGear': ('Gear', 'RdBu', None),
+    'Brake': ('Brake', [[0, 'gray'], [1, 'red']], (0, 1)),
+}
+
+# Colouring option showing which driver is fastest through each mini-sector
+MINI_SECTOR_OPTION = 'Mini-Sectors'
+MINI_SECTOR_COUNT = 25
+MINI_SECTOR_COLORS = qualitative.Plotly
+
+def build_track_map_figure(session, driver, color_by='Speed', full_resolution=False, selected_laps=None):
+    """
+    Build the track map of a driver's fastest lap (within selected_laps) colored
+    by a telemetry channel. Returns None if the driver has no such lap.
     """
-    Render the track map colored by a specific telemetry channel.
+    ensure_session_data(session, *REQUIRED_DATA)
+    # The racing line geometry is cached; changing the colouring only
+    # swaps the marker colour array
+    max_points = None if full_resolution else TRACK_MAP_POINT_BUDGET
+    line = load_racing_line(session, driver, max_points=max_points, lap_range=selected_laps)
+    if line is None:
+        return None
+
+    label, colorscale, color_range = COLOR_OPTIONS[color_by]
+    cmin, cmax = color_range if color_range else (None, None)
+
+    # Create the plot (WebGL): a faint line for continuity plus markers
+    # coloured by the selected channel
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=line['X'],
+        y=line['Y'],
+        mode='lines',
+        line=dict(color='rgba(128, 128, 128, 0.4)', width=2),
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scattergl(
+        x=line['X'],
+        y=line['Y'],
+        mode='markers',
+        marker=dict(
+            color=line[color_by],
+            colorscale=colorscale,
+            cmin=cmin,
+            cmax=cmax,
+            size=4,
+            showscale=color_range is None,
+            colorbar=dict(title=label)
+        ),
+        name=label,
+        hovertemplate=f"{label}: %{{marker.color}}<extra></extra>"
+    ))
+    fig.update_layout(title=f"{driver} - {label}")
+    return _style_track_map(fig, session)
+
+def build_mini_sector_figure(session, driver, drivers, full_resolution=False, selected_laps=None):
+    """
+    Build the track map of driver's fastest lap with every mini-sector colored
+    by the driver (of drivers) who was fastest through it. Returns None if
+    the geometry or the laps to compare are missing.
+    """
+    ensure_session_data(session, *REQUIRED_DATA)
+    max_points = None if full_resolution else TRACK_MAP_POINT_BUDGET
+    line = load_racing_line(session, driver, max_points=max_points, lap_range=selected_laps)
+    sectors = load_mini_sectors(session, drivers, MINI_SECTOR_COUNT, selected_laps)
+    if line is None or sectors is None or 'Distance' not in line:
+        return None
+
+    segment = sectors.segment_of(line['Distance'])
+    owner = sectors.owner[segment]
+    counts = sectors.owned_counts()
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=line['X'],
+        y=line['Y'],
+        mode='lines',
+        line=dict(color='rgba(128, 128, 128, 0.4)', width=2),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+    # One trace per owner, so the legend names the drivers
+    for i, label in enumerate(sectors.labels):
+        points = owner == i
+        if not points.any():
+            continue
+        fig.add_trace(go.Scattergl(
+            x=line['X'][points],
+            y=line['Y'][points],
+            mode='markers',
+            marker=dict(size=5, color=MINI_SECTOR_COLORS[i % len(MINI_SECTOR_COLORS)]),
+            name=f"{label} ({counts[label]})",
+            customdata=(segment[points] + 1),
+            hovertemplate=f"Mini-sector %{{customdata}}: {label}<extra></extra>"
+        ))
+    fig.update_layout(title=f"Fastest driver per mini-sector ({MINI_SECTOR_COUNT})")
+    fig = _style_track_map(fig, session)
+    fig.update_layout(showlegend=True, legend=dict(orientation="h", yanchor="bottom", y=-0.1))
+    return fig
+
+def _style_track_map(fig, session):
+    # Add Corner Annotations
+    corners = load_circuit_corners(session)
+    if corners is not None:
+        # Create a scatter trace for corners
+        fig.add_trace(go.Scatter(
+            x=corners['X'], 
+            y=corners['Y'], 
+            mode='text', 
+            text=corners['Number'].astype(str),
+            textposition="top center",
+            textfont=dict(size=10, color="white"),
+            name="Corners",
+            hoverinfo='skip',
+            showlegend=False
+        ))
+    
+    # Style the plot to look like a track map
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=False, zeroline=False, visible=False),
+        yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x", scaleratio=1),
+        margin=dict(l=0, r=0, t=30, b=0),
+        height=500,
+        showlegend=False
+    )
+    return fig
+
+@traced()
+def render_track_map(session, selected_drivers, color_by='Speed', full_resolution=False, selected_laps=None):
+    """
+    Render the track map colored by a specific telemetry channel, using each
+    driver's fastest lap within the selected lap range.
+    The racing line is downsampled to TRACK_MAP_POINT_BUDGET unless full_resolution is set.
     """
     st.markdown("### 📍 Telemetry Track Map")
     
     # Controls for the map
     col1, col2 = st.columns([1, 1])
     with col1:
-        color_option = st.selectbox("Color Track By", ['Speed', 'nGear', 'Brake'], index=0)
+        color_option = st.selectbox("Color Track By", list(COLOR_OPTIONS) + [MINI_SECTOR_OPTION], index=0)
     
     with col2:
         driver_for_map = st.selectbox("Select Driver for Map", selected_drivers, index=0)
@@ -24,49 +165,15 @@ def render_track_map(session, selected_drivers, color_by='Speed'):
 
     with st.spinner(f"Generating track map for {driver_for_map}..."):
         try:
-            lap = session.laps.pick_drivers(driver_for_map).pick_fastest()
-            if lap is None:
+            if color_option == MINI_SECTOR_OPTION:
+                fig = build_mini_sector_figure(session, driver_for_map, selected_drivers, full_resolution, selected_laps)
+            else:
+                fig = build_track_map_figure(session, driver_for_map, color_option, full_resolution, selected_laps)
+            if fig is None:
                 st.warning(f"No fastest lap data available for {driver_for_map}.")
                 return
-                
-            tel = lap.get_telemetry()
-            
-            # Create the plot
-            if color_option == 'Speed':
-                fig = px.scatter(tel, x='X', y='Y', color='Speed', title=f"{driver_for_map} - Speed", color_continuous_scale='Viridis')
-            elif color_option == 'nGear':
-                fig = px.scatter(tel, x='X', y='Y', color='nGear', title=f"{driver_for_map} - Gear", color_continuous_scale='RdBu')
-            elif color_option == 'Brake':
-                fig = px.scatter(tel, x='X', y='Y', color='Brake', title=f"{driver_for_map} - Brake", color_discrete_map={0: 'gray', 1: 'red'})
-            
-            # Add Corner Annotations
-            circuit_info = session.get_circuit_info()
-            if circuit_info is not None:
-                corners = circuit_info.corners
-                # Create a scatter trace for corners
-                fig.add_trace(go.Scatter(
-                    x=corners['X'], 
-                    y=corners['Y'], 
-                    mode='text', 
-                    text=corners['Number'].astype(str),
-                    textposition="top center",
-                    textfont=dict(size=10, color="white"),
-                    name="Corners",
-                    hoverinfo='skip'
-                ))
-            
-            # Style the plot to look like a track map
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(showgrid=False, zeroline=False, visible=False),
-                yaxis=dict(showgrid=False, zeroline=False, visible=False, scaleanchor="x", scaleratio=1),
-                margin=dict(l=0, r=0, t=30, b=0),
-                height=500,
-                showlegend=False
-            )
             
-            st.plotly_chart(fig, width="stretch")
+            show_figure(fig)
             
         except Exception as e:
             st.error(f"Error generating track map: {e}")
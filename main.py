@@ -1,11 +1,9 @@
 import streamlit as st
 from utils.styling import apply_custom_css
-from utils.data_loader import load_session
+from utils.profiling import start_run, end_run
 
 from components.sidebar import render_sidebar
-from components.track_map import render_track_map
-from components.telemetry import render_telemetry_traces, render_strategy_charts
-from components.lap_analysis import render_lap_analysis
+from components.performance import render_performance_toggle, render_performance_panel, profiled_fragment
 
 # Page config
 st.set_page_config(
@@ -18,34 +16,80 @@ st.set_page_config(
 # Apply custom styling
 apply_custom_css()
 
+# Collect timing spans for this rerun when the performance panel is enabled
+if st.session_state.get('profiling_enabled'):
+    start_run()
+
 # Render Sidebar
 sidebar_data = render_sidebar()
 
 # Main Layout
-if sidebar_data and sidebar_data['session']:
+if sidebar_data and 'comparison' in sidebar_data:
+    if sidebar_data['comparison']:
+        from components.comparison import render_session_comparison
+        profiled_fragment(render_session_comparison)(sidebar_data['comparison'])
+    else:
+        st.info("Pick years and sessions and click 'Compare Sessions' to begin.")
+
+elif sidebar_data and sidebar_data['session']:
     session = sidebar_data['session']
     year = sidebar_data['year']
     gp = sidebar_data['gp']
     session_type = sidebar_data['session_type']
     selected_drivers = sidebar_data['selected_drivers']
     selected_laps = sidebar_data['selected_laps']
+    full_resolution = sidebar_data['full_resolution']
     
     # Top Header
     st.title(f"{year} {gp} - {session_type}")
+
+    # Chart components (and plotly) are only imported once a session is shown,
+    # so the landing page and sidebar do not wait for them
+    from components.track_map import render_track_map
+    from components.telemetry import render_telemetry_traces
+    from components.strategy import render_strategy_charts
+    from components.lap_analysis import render_lap_analysis
+    from components.replay import render_race_replay, replay_run_every
+
+    # Each panel reruns on its own when one of its controls changes, instead of
+    # rerunning the whole page (the components stay plain functions so they can
+    # also be called outside a Streamlit run). Fragment-only reruns are
+    # profiled as runs of their own
+    track_map_panel = profiled_fragment(render_track_map)
+    telemetry_panel = profiled_fragment(render_telemetry_traces)
+    strategy_panel = profiled_fragment(render_strategy_charts)
+    lap_analysis_panel = profiled_fragment(render_lap_analysis)
+    # While playing, the replay reruns on its own once per tick
+    replay_panel = profiled_fragment(render_race_replay, run_every=replay_run_every())
     
     # Split Layout
     col_left, col_right = st.columns([1, 1])
-    
-    with col_left:
-        render_track_map(session, selected_drivers)
-        render_strategy_charts(session, selected_drivers)
-        
-    with col_right:
-        render_telemetry_traces(session, selected_drivers)
+    track_map_slot = col_left.container()
+    strategy_slot = col_left.container()
+    telemetry_slot = col_right.container()
     
     # Full Width Section for Lap Analysis
     st.markdown("---")
-    render_lap_analysis(session, selected_drivers)
+    lap_analysis_slot = st.container()
+    st.markdown("---")
+    replay_slot = st.container()
+
+    # Laps-only panels are rendered first so the page appears before the
+    # telemetry-bound panels trigger the (slower) telemetry load
+    with strategy_slot:
+        strategy_panel(session, selected_drivers, selected_laps)
+
+    with lap_analysis_slot:
+        lap_analysis_panel(session, selected_drivers, selected_laps)
+
+    with replay_slot:
+        replay_panel(session, selected_drivers)
+
+    with track_map_slot:
+        track_map_panel(session, selected_drivers, full_resolution=full_resolution, selected_laps=selected_laps)
+
+    with telemetry_slot:
+        telemetry_panel(session, selected_drivers, full_resolution=full_resolution, selected_laps=selected_laps)
 
 else:
     st.info("Please select a session and click 'Load Session Data' to begin.")
@@ -60,3 +104,7 @@ else:
     - ⚔️ **Battle Analysis**: Track position changes and gaps.
     - 🛞 **Strategy Insights**: Tyre stints and lap time consistency.
     """)
+
+# Performance panel (rendered last so it covers the whole rerun)
+render_performance_toggle()
+render_performance_panel(end_run())
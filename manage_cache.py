@@ -0,0 +1,109 @@
+"""
+Inspect and prune the on-disk cache.
+
+Shows the footprint and hit statistics of the FastF1 cache and the derived
+store per season (or per session), and removes or compresses sessions:
+
+    uv run python manage_cache.py usage --sessions
+    uv run python manage_cache.py prune --max-gb 10
+    uv run python manage_cache.py prune --season 2021 --dry-run
+    uv run python manage_cache.py prune --http
+    uv run python manage_cache.py compress --older-than-days 14
+"""
+import argparse
+import time
+from collections import defaultdict
+
+from utils.data_loader import CACHE_MANAGER
+
+DAY = 86400
+
+
+def _mb(nbytes):
+    return f"{nbytes / 1024 ** 2:9.1f} MB"
+
+
+def _age(timestamp):
+    return f"{(time.time() - timestamp) / DAY:6.1f} d"
+
+
+def show_usage(by_session=False):
+    rows = CACHE_MANAGER.usage()
+    group = 'session' if by_session else 'season'
+
+    totals = defaultdict(lambda: {'bytes': 0, 'dirs': 0, 'hits': 0, 'misses': 0, 'last_used': 0, 'compressed': 0})
+    counted = set()
+    for row in rows:
+        total = totals[row[group]]
+        total['bytes'] += row['bytes']
+        total['dirs'] += 1
+        total['last_used'] = max(total['last_used'], row['last_used'])
+        total['compressed'] += row['compressed']
+        # Hit counts are per session, not per directory
+        if row['session'] not in counted:
+            counted.add(row['session'])
+            total['hits'] += row['hits']
+            total['misses'] += row['misses']
+
+    print(f"{group.title():<40} {'Size':>12} {'Dirs':>5} {'Hits':>5} {'Miss':>5} {'Last used':>9}  Compressed")
+    for name, total in sorted(totals.items()):
+        print(f"{name:<40} {_mb(total['bytes'])} {total['dirs']:>5} {total['hits']:>5} {total['misses']:>5} "
+              f"{_age(total['last_used'])}  {total['compressed']}/{total['dirs']}")
+
+    tracked = sum(row['bytes'] for row in rows)
+    overall = CACHE_MANAGER.total_bytes()
+    quota = _mb(CACHE_MANAGER.max_bytes).strip() if CACHE_MANAGER.max_bytes else 'none'
+    http = CACHE_MANAGER.http_cache_bytes()
+    print(f"\nSessions {_mb(tracked).strip()}, HTTP cache {_mb(http).strip()}, "
+          f"other files (manifests) {_mb(overall - tracked - http).strip()}, "
+          f"total {_mb(overall).strip()}, quota {quota}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and prune the FastF1 and derived caches.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    usage = commands.add_parser('usage', help="Show footprint and hit statistics")
+    usage.add_argument('--sessions', action='store_true', help="Break down per session instead of per season")
+
+    prune = commands.add_parser('prune', help="Remove sessions, least recently used first")
+    prune.add_argument('--max-gb', type=float, help="Shrink the cache to this size")
+    prune.add_argument('--older-than-days', type=float, help="Remove sessions unused for this many days")
+    prune.add_argument('--season', nargs='+', help="Remove these seasons")
+    prune.add_argument('--http', action='store_true', help="Delete expired responses from FastF1's HTTP cache")
+    prune.add_argument('--dry-run', action='store_true')
+
+    compress = commands.add_parser('compress', help="Compress sessions that have not been used recently")
+    compress.add_argument('--older-than-days', type=float, default=7)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'usage':
+        show_usage(by_session=args.sessions)
+    elif args.command == 'prune':
+        if args.max_gb is None and args.older_than_days is None and not args.season and not args.http:
+            parser.error("prune needs --max-gb, --older-than-days, --season or --http")
+        if args.http:
+            if args.dry_run:
+                print(f"Would trim the HTTP cache ({_mb(CACHE_MANAGER.http_cache_bytes()).strip()})")
+            else:
+                print(f"Trimmed the HTTP cache by {_mb(CACHE_MANAGER.trim_http_cache()).strip()}")
+            if args.max_gb is None and args.older_than_days is None and not args.season:
+                return
+        removed = CACHE_MANAGER.prune(
+            max_bytes=int(args.max_gb * 1024 ** 3) if args.max_gb is not None else None,
+            older_than=args.older_than_days * DAY if args.older_than_days is not None else None,
+            seasons=set(args.season) if args.season else None,
+            dry_run=args.dry_run
+        )
+        verb = "Would remove" if args.dry_run else "Removed"
+        for row in removed:
+            print(f"{verb} {row['path']} ({_mb(row['bytes']).strip()}, last used {_age(row['last_used']).strip()} ago)")
+        print(f"{verb} {len(removed)} directories, {_mb(sum(row['bytes'] for row in removed)).strip()}")
+    else:
+        saved = CACHE_MANAGER.compress_cold(older_than=args.older_than_days * DAY)
+        print(f"Saved {_mb(saved).strip()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""
+Headless report renderer.
+
+Renders the dashboard charts (track maps, telemetry, tyre stints, lap time
+distribution, positions, gaps) of many sessions to static HTML or JSON files
+without Streamlit, reusing the components' figure builders. Jobs are grouped
+by session so every session is loaded once per run, and the sessions are
+rendered in parallel on a process pool. Outputs whose inputs (job, session
+data and chart code) have not changed since the last run are skipped.
+
+    uv run python render_reports.py --year 2024 --gp Monza --session Race --drivers VER LEC NOR
+    uv run python render_reports.py --jobs weekly.json --format html json --workers 4
+
+A jobs file holds a list of objects with year, gp, session, drivers and
+optionally laps ([first, last]) and charts (names from CHARTS).
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from components.track_map import build_track_map_figure, build_mini_sector_figure
+from components.telemetry import build_telemetry_figure
+from components.strategy import build_tyre_stints_figure, build_lap_time_distribution_figure
+from components.lap_analysis import build_position_figure, build_gap_figure
+from utils.data_loader import DERIVED_STORE
+
+OUTPUT_DIR = 'reports'
+
+# Chart name -> builder(session, drivers, laps); track maps are rendered per driver
+CHARTS = {
+    'track_map': lambda session, drivers, laps: build_track_map_figure(session, drivers[0], selected_laps=laps),
+    'mini_sectors': lambda session, drivers, laps: build_mini_sector_figure(session, drivers[0], drivers, selected_laps=laps),
+    'telemetry': lambda session, drivers, laps: build_telemetry_figure(session, drivers, selected_laps=laps),
+    'tyre_stints': build_tyre_stints_figure,
+    'lap_times': build_lap_time_distribution_figure,
+    'positions': build_position_figure,
+    'gap_to_reference': lambda session, drivers, laps: build_gap_figure(session, drivers, "Reference Driver", laps),
+    'gap_to_leader': lambda session, drivers, laps: build_gap_figure(session, drivers, "Leader", laps),
+    'interval': lambda session, drivers, laps: build_gap_figure(session, drivers, "Car Ahead", laps),
+}
+PER_DRIVER_CHARTS = {'track_map'}
+
+# Sources whose changes invalidate every rendered output
+RENDER_SOURCES = [
+    'components/track_map.py', 'components/telemetry.py', 'components/strategy.py',
+    'components/lap_analysis.py', 'utils/data_loader.py', 'utils/processing.py', 'utils/downsample.py',
+]
+
+# Sessions are loaded with lap timing only; charts pull telemetry on demand,
+# so a stored session is served from the derived store
+REPORT_PARTS = ('laps',)
+
+
+def _slug(value):
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(value))
+
+
+def code_fingerprint():
+    digest = hashlib.sha256()
+    root = os.path.dirname(os.path.abspath(__file__))
+    for path in RENDER_SOURCES:
+        with open(os.path.join(root, path), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_jobs(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def job_key(job):
+    return (int(job['year']), job['gp'], job['session'])
+
+
+def job_dir(out_dir, job):
+    name = '-'.join(job['drivers'])
+    if job.get('laps'):
+        name += f"_laps{job['laps'][0]}-{job['laps'][1]}"
+    return os.path.join(out_dir, str(job['year']), _slug(job['gp']), _slug(job['session']), _slug(name))
+
+
+def job_outputs(job, formats):
+    """
+    List (chart, drivers, file name) for every output of a job.
+    """
+    drivers = list(job['drivers'])
+    outputs = []
+    for chart in job.get('charts') or list(CHARTS):
+        if chart not in CHARTS:
+            raise ValueError(f"unknown chart {chart!r}")
+        if chart == 'gap_to_reference' and len(drivers) < 2:
+            continue
+        targets = [([driver], f"{chart}_{driver}") for driver in drivers] if chart in PER_DRIVER_CHARTS else [(drivers, chart)]
+        for chart_drivers, name in targets:
+            for fmt in formats:
+                outputs.append((chart, chart_drivers, f"{name}.{fmt}"))
+    return outputs
+
+
+def fingerprint(data, code, job, chart, drivers, file_name):
+    payload = json.dumps([data, code, job_key(job), job.get('laps'), chart, drivers, file_name])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _sidecar(path):
+    return f"{path}.fingerprint"
+
+
+def is_current(path, expected):
+    if expected is None or not os.path.exists(path):
+        return False
+    try:
+        with open(_sidecar(path)) as f:
+            return f.read().strip() == expected
+    except OSError:
+        return False
+
+
+def _write_figure(fig, path):
+    tmp = f"{path}.tmp"
+    if path.endswith('.html'):
+        fig.write_html(tmp, include_plotlyjs='cdn')
+    else:
+        fig.write_json(tmp)
+    os.replace(tmp, path)
+
+
+def render_session(key, tasks, out_dir, code):
+    """
+    Load one session in a worker process and render the given (job, outputs)
+    tasks. Returns one result per output.
+    """
+    import fastf1
+    from utils import data_loader
+
+    fastf1.set_log_level('WARNING')
+    start = time.perf_counter()
+    session = data_loader.load_session(*key, parts=REPORT_PARTS)
+    load_seconds = time.perf_counter() - start
+    if session is None:
+        raise RuntimeError("session could not be loaded")
+
+    results = []
+    written = []
+    figures = {}
+    try:
+        for job, outputs in tasks:
+            directory = job_dir(out_dir, job)
+            os.makedirs(directory, exist_ok=True)
+            laps = tuple(job['laps']) if job.get('laps') else None
+            for chart, drivers, file_name in outputs:
+                path = os.path.join(directory, file_name)
+                start = time.perf_counter()
+                try:
+                    # The HTML and JSON outputs of a chart share one figure
+                    figure_key = (chart, tuple(drivers), laps)
+                    if figure_key not in figures:
+                        figures[figure_key] = CHARTS[chart](session, drivers, laps)
+                    fig = figures[figure_key]
+                    if fig is None:
+                        raise RuntimeError("no data")
+                    _write_figure(fig, path)
+                except Exception as e:
+                    results.append({'path': path, 'error': str(e)})
+                    continue
+                results.append({'path': path, 'seconds': time.perf_counter() - start})
+                written.append((path, job, chart, drivers, file_name))
+            figures.clear()
+    finally:
+        # Do not keep the session alive in this worker's pool
+        data_loader.SESSION_POOL.discard(key)
+
+    # Fingerprints use the stored data as it is after this load, which is
+    # what the next run will compare against
+    data = DERIVED_STORE.fingerprint(key)
+    if data is not None:
+        for path, job, chart, drivers, file_name in written:
+            with open(_sidecar(path), 'w') as f:
+                f.write(fingerprint(data, code, job, chart, drivers, file_name))
+    return {'load_seconds': load_seconds, 'results': results}
+
+
+def plan(jobs, out_dir, formats, code, force=False):
+    """
+    Group the outputs that need rendering by session key. Returns the plan
+    and the number of outputs skipped as unchanged.
+    """
+    tasks = defaultdict(list)
+    skipped = 0
+    data = {}
+    for job in jobs:
+        key = job_key(job)
+        if key not in data:
+            data[key] = DERIVED_STORE.fingerprint(key)
+        directory = job_dir(out_dir, job)
+        stale = []
+        for chart, drivers, file_name in job_outputs(job, formats):
+            expected = fingerprint(data[key], code, job, chart, drivers, file_name)
+            if not force and is_current(os.path.join(directory, file_name), expected):
+                skipped += 1
+            else:
+                stale.append((chart, drivers, file_name))
+        if stale:
+            tasks[key].append((job, stale))
+    return dict(tasks), skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render dashboard charts of many sessions to static files.")
+    parser.add_argument('--jobs', help="JSON file with a list of jobs")
+    parser.add_argument('--year', type=int)
+    parser.add_argument('--gp')
+    parser.add_argument('--session', default='Race')
+    parser.add_argument('--drivers', nargs='+')
+    parser.add_argument('--laps', type=int, nargs=2, metavar=('FIRST', 'LAST'))
+    parser.add_argument('--charts', nargs='+', choices=list(CHARTS))
+    parser.add_argument('--format', nargs='+', choices=['html', 'json'], default=['html'])
+    parser.add_argument('--output', default=OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--force', action='store_true', help="Render even outputs that are up to date")
+    args = parser.parse_args(argv)
+
+    if args.jobs:
+        jobs = load_jobs(args.jobs)
+    elif args.year and args.gp and args.drivers:
+        jobs = [{'year': args.year, 'gp': args.gp, 'session': args.session, 'drivers': args.drivers,
+                 'laps': args.laps, 'charts': args.charts}]
+    else:
+        parser.error("pass --jobs or --year, --gp and --drivers")
+
+    code = code_fingerprint()
+    tasks, skipped = plan(jobs, args.output, args.format, code, force=args.force)
+    outputs = sum(len(stale) for session_tasks in tasks.values() for _, stale in session_tasks)
+    print(f"{len(jobs)} jobs, {skipped} outputs up to date, {outputs} to render from {len(tasks)} sessions "
+          f"with {args.workers} workers")
+
+    start = time.perf_counter()
+    rendered = failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(render_session, key, session_tasks, args.output, code): key
+                   for key, session_tasks in tasks.items()}
+        for n, future in enumerate(as_completed(futures), 1):
+            name = '|'.join(str(part) for part in futures[future])
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += sum(len(stale) for _, stale in tasks[futures[future]])
+                print(f"[{n}/{len(tasks)}] {name}: FAILED ({e})")
+                continue
+            errors = [r for r in result['results'] if 'error' in r]
+            rendered += len(result['results']) - len(errors)
+            failed += len(errors)
+            print(f"[{n}/{len(tasks)}] {name}: loaded in {result['load_seconds']:.1f} s, "
+                  f"{len(result['results']) - len(errors)} outputs")
+            for error in errors:
+                print(f"    {error['path']}: FAILED ({error['error']})")
+
+    print(f"Done in {time.perf_counter() - start:.1f} s: {rendered} rendered, {skipped} skipped, {failed} failed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: the index is only serialized within one process
+    fcntl = None
+
+# Bookkeeping file kept in the cache root (last use and hit counts per session)
+INDEX_FILE = 'cache_index.json'
+
+# FastF1's HTTP response cache (SQLite plus its journal files). Responses
+# expire after 12 hours but stay in the file until trim_http_cache deletes them
+HTTP_CACHE_NAME = 'fastf1_http_cache'
+
+# Suffix of FastF1 cache files compressed while cold
+COMPRESSED_SUFFIX = '.gz'
+
+
+def key_str(key):
+    return '|'.join(str(part) for part in key)
+
+
+def dir_bytes(path):
+    """
+    Total size of the files below path.
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def fastf1_session_dir(root, session):
+    """
+    Directory FastF1's cache uses for a session (its api_path without '/static/').
+    """
+    api_path = getattr(session, 'api_path', None)
+    if not api_path:
+        return None
+    return os.path.join(root, api_path[len('/static/'):].strip('/'))
+
+
+class CacheManager:
+    """
+    Keeps the on-disk cache (FastF1 files, its HTTP cache and the derived
+    store) within a byte quota.
+
+    Every session load is recorded with the directories it uses. When the
+    cache exceeds max_bytes, the least recently used session directories are
+    removed, after the expired responses of FastF1's HTTP cache; directories
+    of sessions unused for compress_after seconds are compressed first and
+    decompressed again before FastF1 reads them.
+    """
+
+    def __init__(self, root, max_bytes=None, compress_after=None, derived_store=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.compress_after = compress_after
+        self.derived_store = derived_store
+        self._index_path = os.path.join(root, INDEX_FILE)
+        self._lock = threading.Lock()
+
+    # Index
+
+    @contextmanager
+    def _locked(self):
+        # The index is shared with other processes (warm_cache.py and
+        # render_reports.py workers), so the thread lock is paired with a
+        # lock on a file next to it
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(f"{self._index_path}.lock", 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _read_index(self):
+        try:
+            with open(self._index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault('sessions', {})
+        index.setdefault('dirs', {})
+        return index
+
+    def _write_index(self, index):
+        # Caller holds _locked(); the temp file is unique as well, since
+        # processes are not serialized where flock is unavailable
+        fd, tmp = tempfile.mkstemp(prefix=f"{INDEX_FILE}.", suffix='.tmp', dir=self.root)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(index, f, indent=1)
+            os.replace(tmp, self._index_path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.root)
+
+    def record_load(self, key, paths, hit):
+        """
+        Record that the session key was loaded from (or into) paths; hit means
+        it was served from disk rather than downloaded.
+        """
+        name = key_str(key)
+        with self._locked():
+            index = self._read_index()
+            stats = index['sessions'].setdefault(name, {'key': list(key), 'hits': 0, 'misses': 0})
+            stats['hits' if hit else 'misses'] += 1
+            stats['last_used'] = time.time()
+            for path in paths:
+                if path:
+                    entry = index['dirs'].setdefault(self._rel(path), {})
+                    entry['session'] = name
+            self._write_index(index)
+
+    # Compression
+
+    def restore(self, path):
+        """
+        Decompress the FastF1 files of a cold session directory so FastF1 can read them.
+        """
+        if not path or not os.path.isdir(path):
+            return
+        for name in os.listdir(path):
+            if not name.endswith(COMPRESSED_SUFFIX):
+                continue
+            source = os.path.join(path, name)
+            target = source[:-len(COMPRESSED_SUFFIX)]
+            tmp = f"{target}.tmp"
+            with gzip.open(source, 'rb') as src, open(tmp, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, target)
+            os.remove(source)
+        with self._locked():
+            index = self._read_index()
+            entry = index['dirs'].get(self._rel(path))
+            if entry and entry.pop('compressed', None):
+                self._write_index(index)
+
+    def _compress_dir(self, path, session):
+        if self._rel(path).split(os.sep)[0] == 'derived':
+            # Derived store entries are compressed by the store itself (Arrow zstd)
+            key = session.get('key') if session else None
+            if self.derived_store is None or key is None:
+                return 0
+            return self.derived_store.compress(tuple(key))
+
+        saved = 0
+        for name in os.listdir(path):
+            if not name.endswith('.ff1pkl'):
+                continue
+            source = os.path.join(path, name)
+            before = os.path.getsize(source)
+            target = source + COMPRESSED_SUFFIX
+            with open(source, 'rb') as src, gzip.open(f"{target}.tmp", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(f"{target}.tmp", target)
+            os.remove(source)
+            saved += before - os.path.getsize(target)
+        return saved
+
+    # Usage and eviction
+
+    def usage(self):
+        """
+        Per-directory footprint: path, session, season, bytes, last_used,
+        hits, misses and compressed. Directories that were never recorded
+        (e.g. cached before the manager existed) are found by scanning.
+        """
+        with self._locked():
+            index = self._read_index()
+
+        rows = []
+        for rel in sorted(set(index['dirs']) | set(self._scan())):
+            path = os.path.join(self.root, rel)
+            if not os.path.isdir(path):
+                continue
+            entry = index['dirs'].get(rel, {})
+            session = index['sessions'].get(entry.get('session'), {})
+            key = session.get('key')
+            rows.append({
+                'path': rel,
+                'session': entry.get('session') or rel,
+                'season': str(key[0]) if key else _season_from_path(rel),
+                'bytes': dir_bytes(path),
+                'last_used': session.get('last_used') or os.path.getmtime(path),
+                'hits': session.get('hits', 0),
+                'misses': session.get('misses', 0),
+                'compressed': bool(entry.get('compressed')),
+            })
+        return rows
+
+    def _scan(self):
+        # FastF1 stores sessions as <year>/<event>/<session>, the derived
+        # store as derived/<year>/<gp>/<session>
+        found = []
+        for top in os.listdir(self.root) if os.path.isdir(self.root) else []:
+            base = os.path.join(self.root, top)
+            if not os.path.isdir(base):
+                continue
+            prefix = [top]
+            if top == 'derived':
+                years = os.listdir(base)
+                groups = [(os.path.join(base, year), prefix + [year]) for year in years]
+            elif top.isdigit():
+                groups = [(base, prefix)]
+            else:
+                continue
+            for group, parts in groups:
+                if not os.path.isdir(group):
+                    continue
+                for event in os.listdir(group):
+                    event_dir = os.path.join(group, event)
+                    if not os.path.isdir(event_dir):
+                        continue
+                    for session in os.listdir(event_dir):
+                        if os.path.isdir(os.path.join(event_dir, session)):
+                            found.append(os.path.join(*parts, event, session))
+        return found
+
+    def total_bytes(self):
+        return dir_bytes(self.root)
+
+    def http_cache_bytes(self):
+        """
+        Size of FastF1's HTTP response cache files.
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        return sum(
+            os.path.getsize(os.path.join(self.root, name))
+            for name in os.listdir(self.root) if name.startswith(HTTP_CACHE_NAME)
+        )
+
+    def trim_http_cache(self):
+        """
+        Delete the expired responses from FastF1's HTTP cache and vacuum it.
+        Returns the number of bytes freed.
+        """
+        path = os.path.join(self.root, HTTP_CACHE_NAME)
+        if not os.path.exists(f"{path}.sqlite"):
+            return 0
+        # requests-cache is installed with FastF1
+        from requests_cache import SQLiteCache
+        before = self.http_cache_bytes()
+        cache = SQLiteCache(path)
+        try:
+            cache.delete(expired=True, vacuum=True)
+        finally:
+            cache.close()
+        return before - self.http_cache_bytes()
+
+    def prune(self, max_bytes=None, older_than=None, seasons=None, protected=(), dry_run=False):
+        """
+        Remove session directories, least recently used first, until the cache
+        fits max_bytes; also remove everything unused for older_than seconds or
+        belonging to one of seasons. Sessions in protected (key strings) are kept.
+        Returns the removed rows (the rows that would be removed if dry_run).
+        """
+        # A session's FastF1 and derived store directories are removed together
+        sessions = {}
+        for row in self.usage():
+            sessions.setdefault(row['session'], []).append(row)
+
+        total = self.total_bytes()
+        now = time.time()
+        removed = []
+        for name, rows in sorted(sessions.items(), key=lambda item: max(row['last_used'] for row in item[1])):
+            if name in protected:
+                continue
+            row = rows[0]
+            expired = older_than is not None and now - row['last_used'] > older_than
+            in_season = seasons is not None and row['season'] in seasons
+            over_quota = max_bytes is not None and total > max_bytes
+            if not (expired or in_season or over_quota):
+                continue
+            for row in rows:
+                if not dry_run:
+                    shutil.rmtree(os.path.join(self.root, row['path']), ignore_errors=True)
+                total -= row['bytes']
+                removed.append(row)
+
+        if removed and not dry_run:
+            with self._locked():
+                index = self._read_index()
+                for row in removed:
+                    index['dirs'].pop(row['path'], None)
+                live = {entry.get('session') for entry in index['dirs'].values()}
+                index['sessions'] = {k: v for k, v in index['sessions'].items() if k in live}
+                self._write_index(index)
+        return removed
+
+    def compress_cold(self, older_than=None, protected=()):
+        """
+        Compress session directories unused for older_than seconds (default
+        compress_after). Returns the number of bytes saved.
+        """
+        older_than = self.compress_after if older_than is None else older_than
+        if older_than is None:
+            return 0
+
+        with self._locked():
+            index = self._read_index()
+        now = time.time()
+        saved = 0
+        compressed = []
+        for row in self.usage():
+            if row['compressed'] or row['session'] in protected or now - row['last_used'] <= older_than:
+                continue
+            session = index['sessions'].get(row['session'])
+            saved += self._compress_dir(os.path.join(self.root, row['path']), session)
+            compressed.append(row['path'])
+
+        if compressed:
+            with self._locked():
+                index = self._read_index()
+                for rel in compressed:
+                    index['dirs'].setdefault(rel, {})['compressed'] = True
+                self._write_index(index)
+        return saved
+
+    def enforce(self, protected=()):
+        """
+        Compress cold sessions, then trim the HTTP cache and evict least
+        recently used sessions until the cache fits its quota. Returns the
+        evicted rows.
+        """
+        if self.compress_after is not None:
+            self.compress_cold(protected=protected)
+        if self.max_bytes is None:
+            return []
+        if self.total_bytes() <= self.max_bytes:
+            return []
+        # Expired responses go first: FastF1 only serves them when a fresh
+        # download fails
+        try:
+            self.trim_http_cache()
+        except Exception as e:
+            # e.g. the database is locked by a running download
+            print(f"Error trimming HTTP cache: {e}")
+        if self.total_bytes() <= self.max_bytes:
+            return []
+        return self.prune(max_bytes=self.max_bytes, protected=protected)
+
+
+def _season_from_path(rel):
+    parts = rel.split(os.sep)
+    if parts[0] == 'derived' and len(parts) > 1:
+        return parts[1]
+    return parts[0]
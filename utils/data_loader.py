@@ -1,36 +1,945 @@
-import fastf1
 import pandas as pd
 import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
-# Enable caching
+from utils.session_pool import SessionPool
+from utils.cache_manager import CacheManager, fastf1_session_dir, key_str
+from utils.derived_store import DerivedStore, StoredSession
+from utils.telemetry_cache import TelemetryCache, frame_bytes
+from utils.downsample import downsample_frame
+from utils.lap_table import build_lap_table
+from utils.processing import GapEngine, PositionEvents, calculate_overtakes, LapComparison, SessionSummary, ReplayTimeline, MiniSectors, SessionDigest
+from utils.profiling import span, bind, traced
+from utils.prefetch import Prefetcher
+
+# FastF1 is imported and its cache enabled on first use (see _fastf1), so the
+# landing page does not wait for it
 CACHE_DIR = 'cache'
-if not os.path.exists(CACHE_DIR):
-    os.makedirs(CACHE_DIR)
+_FASTF1 = None
+_FASTF1_LOCK = threading.Lock()
+
+
+def _fastf1():
+    """
+    Import FastF1 and enable its cache in CACHE_DIR on first use.
+    """
+    global _FASTF1
+    with _FASTF1_LOCK:
+        if _FASTF1 is None:
+            import fastf1
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            fastf1.Cache.enable_cache(CACHE_DIR)
+            _FASTF1 = fastf1
+    return _FASTF1
+
+# Columnar copies of loaded sessions, read back without re-parsing in FastF1
+DERIVED_STORE = DerivedStore(os.path.join(CACHE_DIR, 'derived'))
+
+# Disk quota for CACHE_DIR (0 disables eviction) and optional compression of
+# sessions unused for some days
+CACHE_MAX_BYTES = int(float(os.environ.get('F1_CACHE_MAX_GB', '20')) * 1024 ** 3) or None
+CACHE_COMPRESS_AFTER_DAYS = os.environ.get('F1_CACHE_COMPRESS_AFTER_DAYS')
+CACHE_MANAGER = CacheManager(
+    CACHE_DIR,
+    max_bytes=CACHE_MAX_BYTES,
+    compress_after=float(CACHE_COMPRESS_AFTER_DAYS) * 86400 if CACHE_COMPRESS_AFTER_DAYS else None,
+    derived_store=DERIVED_STORE
+)
+
+# Quota enforcement walks the whole cache tree, so it runs in the background
+# at most once per this many seconds
+CACHE_ENFORCE_INTERVAL = float(os.environ.get('F1_CACHE_ENFORCE_SECONDS', '60'))
+_ENFORCE_STATE = {'last': None, 'running': False}
+_ENFORCE_LOCK = threading.Lock()
+
+# Loaded sessions are shared by every browser session served by this process
+SESSION_POOL_MAX_BYTES = int(os.environ.get('F1_SESSION_POOL_MB', '4096')) * 1024 ** 2
+
+
+def estimate_session_bytes(session):
+    """
+    Approximate the in-memory size of a loaded session's data frames.
+    """
+    total = 0
+    for attr in ('laps', 'results', 'weather_data', 'race_control_messages'):
+        try:
+            frame = getattr(session, attr)
+        except Exception:
+            # FastF1 raises for data that has not been loaded
+            continue
+        if isinstance(frame, pd.DataFrame):
+            total += int(frame.memory_usage(deep=True).sum())
+
+    for attr in ('car_data', 'pos_data'):
+        try:
+            frames = getattr(session, attr)
+        except Exception:
+            continue
+        for frame in frames.values():
+            total += int(frame.memory_usage(deep=True).sum())
+
+    backing = getattr(session, 'backing', None)
+    if backing is not None:
+        total += estimate_session_bytes(backing)
+
+    return total
+
+
+SESSION_POOL = SessionPool(SESSION_POOL_MAX_BYTES, estimate_session_bytes)
+
+# Extracted per-lap telemetry shared by the track map and telemetry traces
+TELEMETRY_CACHE_MAX_ENTRIES = int(os.environ.get('F1_TELEMETRY_CACHE_ENTRIES', '512'))
+TELEMETRY_CACHE_MAX_BYTES = int(os.environ.get('F1_TELEMETRY_CACHE_MB', '512')) * 1024 ** 2
+TELEMETRY_CACHE = TelemetryCache(TELEMETRY_CACHE_MAX_ENTRIES, TELEMETRY_CACHE_MAX_BYTES)
+
+# Lap-window views of session.laps (the sidebar lap range), shared by all components
+LAPS_WINDOW_CACHE = SessionPool(128 * 1024 ** 2, frame_bytes, max_entries=64)
+
+# Precomputed racing lines (coordinates plus colour channels) for the track map
+RACING_LINE_CHANNELS = ('X', 'Y', 'Distance', 'Speed', 'nGear', 'Brake')
+RACING_LINE_CACHE = SessionPool(
+    64 * 1024 ** 2,
+    lambda line: sum(values.nbytes for values in line.values()),
+    max_entries=256
+)
+
+# Lap x driver time matrices used by every gap view
+GAP_ENGINE_CACHE = SessionPool(
+    64 * 1024 ** 2,
+    lambda engine: engine.times.nbytes,
+    max_entries=64
+)
+
+# Classified position changes (passes, pit-cycle and retirement gains)
+POSITION_EVENTS_CACHE = SessionPool(
+    64 * 1024 ** 2,
+    lambda events: events.positions.nbytes * 8,
+    max_entries=64
+)
+
+# Distance-aligned lap blocks, keyed per (session, laps compared)
+COMPARISON_CACHE = SessionPool(
+    128 * 1024 ** 2,
+    lambda comparison: comparison.time.nbytes * (1 + len(comparison.channels)),
+    max_entries=64
+)
+
+# Session summaries (fastest lap, stints, quantiles, ...), keyed per (session, window)
+SUMMARY_CACHE = SessionPool(
+    32 * 1024 ** 2,
+    lambda summary: frame_bytes(summary.stints) + frame_bytes(summary.lap_time_quantiles),
+    max_entries=128
+)
+
+# Formatted lap explorer frames, one per session (pages are cut from them)
+LAP_TABLE_CACHE = SessionPool(128 * 1024 ** 2, frame_bytes, max_entries=16)
+
+# Mini-sector times and owners, keyed per (session, window, drivers, segments)
+MINI_SECTOR_CACHE = SessionPool(
+    16 * 1024 ** 2,
+    lambda sectors: sectors.segment_times.nbytes * 2,
+    max_entries=128
+)
+
+# Lap x driver matrices driving the race replay, one per session
+REPLAY_TIMELINE_CACHE = SessionPool(
+    64 * 1024 ** 2,
+    lambda timeline: timeline.times.nbytes * 6,
+    max_entries=16
+)
+
+# Per-session digests for comparing sessions, keyed per session; missing
+# ones are built concurrently on at most COMPARISON_WORKERS threads
+COMPARISON_WORKERS = int(os.environ.get('F1_COMPARISON_WORKERS', '3'))
+DIGEST_CACHE = SessionPool(64 * 1024 ** 2, lambda digest: digest.nbytes(), max_entries=64)
+
+# Digests pool their sessions with lap timing only; a full load for
+# fastest-lap telemetry missing from the store runs one at a time
+DIGEST_PARTS = ('laps',)
+_DIGEST_FULL_LOAD_LOCK = threading.Lock()
+
+# Circuit corner annotations, keyed per circuit (year, gp)
+_CORNERS_CACHE = {}
+_CORNERS_LOCK = threading.Lock()
+
+# Thread pool used for batched telemetry extraction
+TELEMETRY_WORKERS = int(os.environ.get('F1_TELEMETRY_WORKERS', '8'))
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+# Independently loadable parts of a session, matching the flags of Session.load()
+SESSION_PARTS = ('laps', 'telemetry', 'weather', 'messages')
+
+# Parts a StoredSession serves itself (telemetry per lap, on demand)
+STORED_PARTS = ('laps', 'telemetry')
+
+# Parts loaded along with another one: FastF1 flags deleted laps (track
+# limits) from the race control messages, so lap timing always brings them
+PART_DEPENDENCIES = {'laps': ('messages',)}
+
+# Session attributes provided by each part
+PART_ATTRS = {
+    'laps': ('laps',),
+    'telemetry': ('car_data', 'pos_data'),
+    'weather': ('weather_data',),
+    'messages': ('race_control_messages',),
+}
+
+# Compact dtypes applied to laps and telemetry after loading (see compact_frame);
+# time columns stay timedelta64[ns]/datetime64[ns], i.e. int64 nanoseconds
+CATEGORY_COLUMNS = ('Driver', 'Compound', 'Team')
+INT8_COLUMNS = ('nGear', 'DRS')
+BOOL_COLUMNS = ('Brake',)
+FLOAT32_COLUMNS = ('Speed', 'RPM', 'Throttle')
+
+# Bytes of all frames passed through compact_session, before and after
+_COMPACTION_STATS = {'sessions': 0, 'bytes_before': 0, 'bytes_after': 0}
+_COMPACTION_LOCK = threading.Lock()
+
+# Per-session bookkeeping: pool key, parts loaded so far and a lock serialising
+# further loads into the same shared session
+_SESSION_STATE = weakref.WeakKeyDictionary()
+
+
+def _compact_dtype(series):
+    name = series.name
+    if name in CATEGORY_COLUMNS:
+        return None if isinstance(series.dtype, pd.CategoricalDtype) else 'category'
+    if name in FLOAT32_COLUMNS:
+        return 'float32' if pd.api.types.is_numeric_dtype(series.dtype) and series.dtype != 'float32' else None
+    if name in INT8_COLUMNS or name in BOOL_COLUMNS:
+        if not pd.api.types.is_numeric_dtype(series.dtype) or series.isna().any():
+            return None
+        if name in BOOL_COLUMNS:
+            return 'bool' if series.dtype != bool and series.isin((0, 1)).all() else None
+        in_range = series.between(-128, 127).all() and (series % 1 == 0).all()
+        return 'int8' if in_range and series.dtype != 'int8' else None
+    if pd.api.types.is_timedelta64_dtype(series.dtype) and series.dtype != 'timedelta64[ns]':
+        return 'timedelta64[ns]'
+    return None
+
+
+def compact_frame(frame):
+    """
+    Return frame with compact column dtypes (categorical names, int8 gear/DRS,
+    bool brake, float32 speed/RPM/throttle). Returns the frame itself if
+    nothing changes; subclasses such as fastf1 Laps/Telemetry are preserved.
+    """
+    dtypes = {}
+    for col in frame.columns:
+        dtype = _compact_dtype(frame[col])
+        if dtype is not None:
+            dtypes[col] = dtype
+    return frame.astype(dtypes) if dtypes else frame
+
+
+def _set_session_frame(session, attr, value):
+    # FastF1 sessions expose their data through read-only properties
+    private = f"_{attr}"
+    setattr(session, private if hasattr(session, private) else attr, value)
+
+
+def compact_session(session):
+    """
+    Compact the laps and raw telemetry frames of a loaded session in place.
+    Returns the (before, after) byte counts of the frames involved.
+    """
+    before = after = 0
+    for attr in PART_ATTRS['laps'] + PART_ATTRS['telemetry']:
+        try:
+            value = getattr(session, attr)
+        except Exception:
+            # FastF1 raises for data that has not been loaded
+            continue
+        if isinstance(value, pd.DataFrame):
+            frames = {None: value}
+        elif isinstance(value, dict):
+            frames = value
+        else:
+            continue
+
+        compacted = {}
+        for name, frame in frames.items():
+            compacted[name] = compact_frame(frame)
+            before += int(frame.memory_usage(deep=True).sum())
+            after += int(compacted[name].memory_usage(deep=True).sum())
+        _set_session_frame(session, attr, compacted[None] if None in compacted else compacted)
+
+    with _COMPACTION_LOCK:
+        _COMPACTION_STATS['sessions'] += 1
+        _COMPACTION_STATS['bytes_before'] += before
+        _COMPACTION_STATS['bytes_after'] += after
+    return before, after
+
 
-fastf1.Cache.enable_cache(CACHE_DIR)
+def get_compaction_stats():
+    """
+    Return the total bytes of compacted session data before and after compaction.
+    """
+    with _COMPACTION_LOCK:
+        return dict(_COMPACTION_STATS)
+
+
+def _track_session(session, key, parts):
+    _SESSION_STATE[session] = {'key': key, 'parts': set(parts), 'lock': threading.Lock()}
+    return session
 
-def load_session(year, gp, session_type):
+
+def register_session(session, key, parts=SESSION_PARTS):
     """
-    Load a session from FastF1.
+    Register a session that was built outside load_session (e.g. a synthetic
+    benchmark session) under key, so the shared caches apply to it.
     """
+    return _track_session(session, key, parts)
+
+
+def _with_dependencies(parts):
+    parts = list(parts)
+    for part in list(parts):
+        parts += [dep for dep in PART_DEPENDENCIES.get(part, ()) if dep not in parts]
+    return tuple(parts)
+
+
+def _enforce_cache_quota(key):
     try:
-        session = fastf1.get_session(year, gp, session_type)
-        session.load()
+        # Pooled sessions, sessions being loaded and the one just loaded are
+        # never evicted or compressed
+        keys = SESSION_POOL.keys() + SESSION_POOL.loading_keys() + [key]
+        for row in CACHE_MANAGER.enforce(protected={key_str(k) for k in keys}):
+            print(f"Evicted {row['path']} from the disk cache ({row['bytes'] / 1024 ** 2:.1f} MB)")
+    except Exception as e:
+        print(f"Error managing cache directory: {e}")
+    finally:
+        with _ENFORCE_LOCK:
+            _ENFORCE_STATE['running'] = False
+
+
+def _record_cache_use(key, paths, hit):
+    # Disk bookkeeping must never fail a load
+    try:
+        CACHE_MANAGER.record_load(key, paths, hit)
+    except Exception as e:
+        print(f"Error managing cache directory: {e}")
+        return
+
+    now = time.monotonic()
+    with _ENFORCE_LOCK:
+        last = _ENFORCE_STATE['last']
+        if _ENFORCE_STATE['running'] or (last is not None and now - last < CACHE_ENFORCE_INTERVAL):
+            return
+        _ENFORCE_STATE.update(last=now, running=True)
+    # Not a daemon thread, so CLI runs finish an eviction before exiting
+    threading.Thread(target=_enforce_cache_quota, args=(key,), name='cache-enforce').start()
+
+
+def _load_fastf1_session(key, parts):
+    parts = _with_dependencies(parts)
+    with span('fastf1.load', key=key, parts=list(parts)):
+        session = _fastf1().get_session(*key)
+        session_dir = fastf1_session_dir(CACHE_DIR, session)
+        on_disk = session_dir is not None and os.path.isdir(session_dir) and bool(os.listdir(session_dir))
+        CACHE_MANAGER.restore(session_dir)
+        session.load(**{part: part in parts for part in SESSION_PARTS})
+    _record_cache_use(key, [session_dir, DERIVED_STORE.entry_dir(key)], hit=on_disk)
+    with span('compact_session') as sp:
+        before, after = compact_session(session)
+        sp.set(bytes_before=before, bytes_after=after)
+    return _track_session(session, key, parts)
+
+
+def _load_session_uncached(key, parts):
+    try:
+        if set(parts) <= set(STORED_PARTS):
+            with span('derived_store.read_session', key=key):
+                stored = DERIVED_STORE.read_session(key)
+            if stored is not None:
+                _record_cache_use(key, [DERIVED_STORE.entry_dir(key)], hit=True)
+                # Stores written before compaction hold object columns
+                compact_session(stored)
+                return _track_session(stored, key, STORED_PARTS)
+
+        session = _load_fastf1_session(key, parts)
+        if 'laps' in parts:
+            try:
+                DERIVED_STORE.write_session(key, session)
+            except Exception as e:
+                print(f"Error writing derived store: {e}")
         return session
     except Exception as e:
         print(f"Error loading session: {e}")
         return None
 
-def load_laps(session):
+
+def _stored_backing(session, parts):
+    """
+    Return the full FastF1 session behind a StoredSession, loading it on first use.
+    Laps whose telemetry is in the store never need it.
+    """
+    with session.backing_lock:
+        loaded = session.backing is None
+        if loaded:
+            session.backing = _load_fastf1_session(session.key, ('laps',) + tuple(parts))
+    backing = ensure_session_data(session.backing, *parts)
+    if loaded:
+        # The backing counts against the pool entry of its StoredSession
+        SESSION_POOL.resize(session.key)
+    return backing
+
+
+def load_session(year, gp, session_type, parts=SESSION_PARTS):
+    """
+    Load a session from FastF1, sharing it through the process-wide session pool.
+
+    Only the requested parts (see SESSION_PARTS) are loaded up front; components
+    pull in anything else they need later through ensure_session_data.
+    """
+    key = (year, gp, session_type)
+    with span('load_session', key=key), PREFETCHER.foreground():
+        session = SESSION_POOL.get_or_load(key, lambda: _load_session_uncached(key, parts))
+        if session is not None:
+            ensure_session_data(session, *parts)
+            if 'laps' in parts:
+                load_session_summary(session)
+    return session
+
+
+# Sessions of the same event that users usually open next, in order
+RELATED_SESSIONS = {
+    'FP1': ('FP2',),
+    'FP2': ('FP3', 'Qualifying'),
+    'FP3': ('Qualifying',),
+    'Qualifying': ('Race', 'FP3'),
+    'Sprint': ('Qualifying', 'Race'),
+    'Race': ('Qualifying', 'Sprint'),
+}
+
+# Prefetched sessions are warmed with lap timing only, like the sidebar's first load
+PREFETCH_PARTS = ('laps',)
+
+
+def _prefetch_session(key):
+    return SESSION_POOL.get_or_load(key, lambda: _load_session_uncached(key, PREFETCH_PARTS))
+
+
+PREFETCHER = Prefetcher(
+    _prefetch_session,
+    max_workers=int(os.environ.get('F1_PREFETCH_WORKERS', '1')),
+    max_pending=int(os.environ.get('F1_PREFETCH_MAX_PENDING', '4'))
+)
+
+
+def prefetch_related(year, gp, session_type, requester=None):
     """
-    Load laps from a session.
+    Warm the related sessions of the same event in the background.
+    requester's earlier prefetches for other events are cancelled; those
+    of other requesters (browser sessions) stay queued.
+    """
+    related = [(year, gp, other) for other in RELATED_SESSIONS.get(session_type, ())]
+    PREFETCHER.cancel(requester, keep=related)
+    PREFETCHER.schedule([key for key in related if key not in SESSION_POOL], requester)
+
+
+def session_warmth(year, gp, session_type):
     """
-    return session.laps
+    How fast a session would load: 'memory' (pooled), 'loading' (being
+    prefetched), 'disk' (in the derived store) or None (cold).
+    """
+    key = (year, gp, session_type)
+    if key in SESSION_POOL:
+        return 'memory'
+    if PREFETCHER.status(key) is not None:
+        return 'loading'
+    if DERIVED_STORE.has_session(key):
+        return 'disk'
+    return None
+
+
+def ensure_session_data(session, *parts):
+    """
+    Load any of the requested parts that are not yet present on the session.
+    """
+    state = _SESSION_STATE.get(session)
+    if state is None:
+        # Not loaded through load_session, assume it was loaded in full
+        return session
+
+    with state['lock']:
+        missing = [part for part in parts if part not in state['parts']]
+        if not missing:
+            return session
+        with span('ensure_session_data', parts=missing):
+            if isinstance(session, StoredSession):
+                backing = _stored_backing(session, missing)
+                for part in missing:
+                    for attr in PART_ATTRS[part]:
+                        setattr(session, attr, getattr(backing, attr))
+            else:
+                missing = [part for part in _with_dependencies(missing) if part not in state['parts']]
+                CACHE_MANAGER.restore(fastf1_session_dir(CACHE_DIR, session))
+                session.load(**{part: part in missing for part in SESSION_PARTS})
+                compact_session(session)
+        state['parts'].update(missing)
+
+    SESSION_POOL.resize(state['key'])
+    return session
+
+
+def get_session_pool_stats():
+    """
+    Return hit/miss/eviction counters for the shared session pool.
+    """
+    return SESSION_POOL.stats()
+
 
-def load_telemetry(session, driver_number=None):
+def clear_caches():
+    """
+    Drop all derived in-memory caches (telemetry, lap windows, geometry, gap
+    and event matrices, aligned comparisons, mini-sectors, summaries, lap
+    tables, replay timelines, session digests, corners). Loaded sessions in the session pool are kept.
+    """
+    for cache in (TELEMETRY_CACHE, LAPS_WINDOW_CACHE, RACING_LINE_CACHE, GAP_ENGINE_CACHE,
+                  POSITION_EVENTS_CACHE, COMPARISON_CACHE, SUMMARY_CACHE, LAP_TABLE_CACHE,
+                  REPLAY_TIMELINE_CACHE, MINI_SECTOR_CACHE, DIGEST_CACHE):
+        cache.clear()
+    with _CORNERS_LOCK:
+        _CORNERS_CACHE.clear()
+
+
+def get_telemetry_cache_stats():
+    """
+    Return hit-rate and occupancy statistics for the shared telemetry cache.
+    """
+    return TELEMETRY_CACHE.stats()
+
+def session_key(session):
+    """
+    Return the (year, gp, session_type) key a session was loaded under, if any.
+    """
+    state = _SESSION_STATE.get(session)
+    return state['key'] if state is not None else None
+
+def lap_window(session, lap_range):
+    """
+    Normalise a (first, last) lap range to a cache key; None when it covers the whole session.
+    """
+    if lap_range is None:
+        return None
+    first, last = int(lap_range[0]), int(lap_range[1])
+    lap_numbers = session.laps['LapNumber']
+    if len(lap_numbers) == 0 or (first <= lap_numbers.min() and last >= lap_numbers.max()):
+        return None
+    return first, last
+
+def load_laps(session, lap_range=None):
+    """
+    Load laps from a session, restricted to the (first, last) lap range if given.
+
+    The filtered view is built once per (session, window) and shared by every
+    component, so narrowing the range shrinks all downstream work. It must not
+    be modified in place.
+    """
+    window = lap_window(session, lap_range)
+    if window is None:
+        return session.laps
+
+    def build():
+        from fastf1.core import Laps
+        laps = session.laps
+        # Detached from the session, so a cached window does not keep a
+        # session the pool has evicted alive
+        return Laps(pd.DataFrame(laps[laps['LapNumber'].between(*window)]), session=None)
+
+    key = session_key(session)
+    if key is None:
+        return build()
+    return LAPS_WINDOW_CACHE.get_or_load((key, window), build)
+
+def _pick_lap(laps, driver, lap_number=None, only_by_time=False):
+    driver_laps = laps.pick_drivers(driver)
+    if lap_number is None:
+        lap = driver_laps.pick_fastest()
+        if lap is None and only_by_time:
+            # A lap window rarely contains the driver's personal best lap
+            lap = driver_laps.pick_fastest(only_by_time=True)
+        return lap
+    match = driver_laps[driver_laps['LapNumber'] == lap_number]
+    return match.iloc[0] if len(match) else None
+
+def _pick_window_lap(session, driver, lap_number, lap_range):
+    window = lap_window(session, lap_range)
+    return _pick_lap(load_laps(session, window), driver, lap_number, only_by_time=window is not None)
+
+def load_lap_telemetry(session, driver, lap_number=None, channels=None, lap_range=None):
+    """
+    Load merged car/position telemetry for one lap of a driver (their fastest by default).
+
+    Results are shared through TELEMETRY_CACHE and must not be modified in place.
+    channels optionally restricts the returned columns; lap_range restricts the
+    laps the fastest one is picked from. Returns None if the driver has no such lap.
+    """
+    lap = _pick_window_lap(session, driver, lap_number, lap_range)
+    if lap is None:
+        return None
+    lap_number = int(lap['LapNumber'])
+
+    key = session_key(session)
+    if key is None:
+        telemetry = _extract_lap_telemetry(session, key, driver, lap_number)
+        return telemetry if channels is None else telemetry[list(channels)]
+
+    telemetry = TELEMETRY_CACHE.get_or_load(
+        (key, driver, lap_number, None),
+        lambda: _extract_lap_telemetry(session, key, driver, lap_number)
+    )
+    if telemetry is None or channels is None:
+        return telemetry
+
+    channels = tuple(channels)
+    return TELEMETRY_CACHE.get_or_load(
+        (key, driver, lap_number, channels),
+        lambda: telemetry[list(channels)]
+    )
+
+def _extract_lap_telemetry(session, key, driver, lap_number):
+    with span('extract_lap_telemetry', driver=driver, lap=lap_number) as sp:
+        telemetry = _extract_lap_telemetry_uncached(session, key, driver, lap_number)
+        if telemetry is not None:
+            # A plain frame: FastF1's Telemetry links back to its session,
+            # which would keep the whole session alive in TELEMETRY_CACHE
+            telemetry = pd.DataFrame(compact_frame(telemetry))
+        sp.set(rows=0 if telemetry is None else len(telemetry))
+    return telemetry
+
+def _extract_lap_telemetry_uncached(session, key, driver, lap_number):
+    # Sessions that hold or generate their own telemetry (e.g. the synthetic
+    # benchmark sessions) provide it directly
+    get_lap_telemetry = getattr(session, 'get_lap_telemetry', None)
+    if get_lap_telemetry is not None:
+        return get_lap_telemetry(driver, lap_number)
+
+    if key is not None:
+        telemetry = DERIVED_STORE.read_lap_telemetry(key, driver, lap_number)
+        if telemetry is not None:
+            return telemetry
+
+    # The lap is picked from the session's own laps: lap windows (see
+    # load_laps) are detached from the session
+    if isinstance(session, StoredSession):
+        session = _stored_backing(session, ('telemetry',))
+    lap = _pick_lap(session.laps, driver, lap_number)
+    if lap is None:
+        return None
+
+    telemetry = lap.get_telemetry()
+    if key is not None:
+        try:
+            DERIVED_STORE.write_lap_telemetry(key, driver, lap_number, telemetry)
+        except Exception as e:
+            print(f"Error writing derived store: {e}")
+    return telemetry
+
+def load_telemetry(session, driver_number=None, lap_range=None):
     """
     Load telemetry for a session or specific driver.
+    Only the laps in lap_range are concatenated, if given.
     """
+    if isinstance(session, StoredSession):
+        # Whole-session telemetry is not in the derived store
+        session = _stored_backing(session, ('telemetry',))
+    else:
+        ensure_session_data(session, 'telemetry')
+
+    # Sliced from the session's own laps: cached lap windows are detached from it
+    laps = session.laps
+    window = lap_window(session, lap_range)
+    if window is not None:
+        laps = laps[laps['LapNumber'].between(*window)]
     if driver_number:
-        return session.laps.pick_drivers(driver_number).get_telemetry()
-    return session.laps.get_telemetry()
+        return laps.pick_drivers(driver_number).get_telemetry()
+    return laps.get_telemetry()
+
+def load_racing_line(session, driver, lap_number=None, max_points=None, lap_range=None):
+    """
+    Return the racing line of one lap as arrays of RACING_LINE_CHANNELS.
+
+    The geometry is computed once per (session, driver, lap, resolution) and
+    cached, so re-colouring the track map only swaps which array is used.
+    max_points downsamples the line; None keeps every sample.
+    """
+    lap = _pick_window_lap(session, driver, lap_number, lap_range)
+    if lap is None:
+        return None
+    lap_number = int(lap['LapNumber'])
+
+    def build():
+        telemetry = load_lap_telemetry(session, driver, lap_number)
+        if telemetry is None:
+            return None
+        telemetry = downsample_frame(telemetry, max_points, ['X', 'Y', 'Speed'])
+        return {
+            channel: telemetry[channel].to_numpy(dtype=float)
+            for channel in RACING_LINE_CHANNELS if channel in telemetry.columns
+        }
+
+    key = session_key(session)
+    if key is None:
+        return build()
+    return RACING_LINE_CACHE.get_or_load((key, driver, lap_number, max_points), build)
+
+def load_gap_engine(session, lap_range=None):
+    """
+    Return the GapEngine (lap x driver time matrix) for a session and lap
+    range, built once per (session, window).
+    """
+    window = lap_window(session, lap_range)
+    key = session_key(session)
+    if key is None:
+        return GapEngine(load_laps(session, window))
+    return GAP_ENGINE_CACHE.get_or_load((key, window), lambda: GapEngine(load_laps(session, window)))
+
+def load_position_events(session, lap_range=None):
+    """
+    Return the PositionEvents (int8 position matrix and classified gains) for
+    a session and lap range.
+    """
+    window = lap_window(session, lap_range)
+    key = session_key(session)
+    if key is None:
+        return PositionEvents(load_laps(session, window))
+    return POSITION_EVENTS_CACHE.get_or_load((key, window), lambda: PositionEvents(load_laps(session, window)))
+
+def load_overtakes(session, lap_range=None):
+    """
+    Return the laps on which a driver passed at least one car (see
+    calculate_overtakes), classified from the session's cached PositionEvents.
+    """
+    window = lap_window(session, lap_range)
+    return calculate_overtakes(load_laps(session, window), events=load_position_events(session, window))
+
+def load_session_summary(session, lap_range=None):
+    """
+    Return the SessionSummary of a session, or of its laps within lap_range.
+
+    The whole-session summary is built at load time and kept in the derived
+    store next to the laps; window summaries are built once per window.
+    """
+    window = lap_window(session, lap_range)
+    key = session_key(session)
+
+    def build():
+        with span('session_summary', window=window):
+            return SessionSummary(load_laps(session, window), session.results)
+
+    if key is None:
+        return build()
+    if window is not None:
+        return SUMMARY_CACHE.get_or_load((key, window), build)
+
+    def load():
+        summary = DERIVED_STORE.read_summary(key)
+        if summary is None:
+            summary = build()
+            try:
+                DERIVED_STORE.write_summary(key, summary)
+            except Exception as e:
+                print(f"Error writing session summary: {e}")
+        return summary
+
+    return SUMMARY_CACHE.get_or_load((key, None), load)
+
+def load_lap_table(session):
+    """
+    Return the lap explorer frame of a session (see utils.lap_table), formatted
+    once per session; filter and page it with lap_table_page.
+    """
+    def build():
+        with span('build_lap_table'):
+            return build_lap_table(session.laps)
+
+    key = session_key(session)
+    if key is None:
+        return build()
+    return LAP_TABLE_CACHE.get_or_load(key, build)
+
+def load_replay_timeline(session):
+    """
+    Return the ReplayTimeline of a session, built once and shared by every replay.
+    """
+    key = session_key(session)
+    if key is None:
+        return ReplayTimeline(session.laps)
+    return REPLAY_TIMELINE_CACHE.get_or_load(key, lambda: ReplayTimeline(session.laps))
+
+def load_lap_comparison(session, laps, lap_range=None):
+    """
+    Return a LapComparison of (driver, lap_number) laps on a common distance grid.
+
+    lap_number may be None for the driver's fastest lap within lap_range. Laps
+    without telemetry are left out; labels are the drivers. Returns None if
+    no lap could be loaded. Cached per (session, resolved laps).
+    """
+    resolved = []
+    for driver, lap_number in laps:
+        lap = _pick_window_lap(session, driver, lap_number, lap_range)
+        if lap is not None:
+            resolved.append((driver, int(lap['LapNumber'])))
+    if not resolved:
+        return None
+
+    def build():
+        telemetry = load_telemetry_batch(session, resolved)
+        pairs = [(driver, tel) for (driver, _), tel in zip(resolved, telemetry) if tel is not None]
+        if not pairs:
+            return None
+        with span('lap_comparison', laps=len(pairs)):
+            return LapComparison([tel for _, tel in pairs], [driver for driver, _ in pairs])
+
+    key = session_key(session)
+    if key is None:
+        return build()
+    return COMPARISON_CACHE.get_or_load((key, tuple(resolved)), build)
+
+def load_mini_sectors(session, drivers, n_segments=25, lap_range=None):
+    """
+    Return the MiniSectors of the drivers' fastest laps within lap_range, or
+    None if no lap could be loaded. Built on the cached lap comparison.
+    """
+    def build():
+        comparison = load_lap_comparison(session, [(driver, None) for driver in drivers], lap_range)
+        if comparison is None or len(comparison.distance) < 2:
+            return None
+        with span('mini_sectors', laps=len(comparison.labels), segments=n_segments):
+            return MiniSectors(comparison, n_segments)
+
+    key = session_key(session)
+    if key is None:
+        return build()
+    return MINI_SECTOR_CACHE.get_or_load((key, lap_window(session, lap_range), tuple(drivers), n_segments), build)
+
+def session_label(key):
+    return ' '.join(str(part) for part in key)
+
+def _fastest_lap_telemetry(session, key, driver, lap_number):
+    # Extracted before (by the dashboard or an earlier digest): read from the store
+    telemetry = DERIVED_STORE.read_lap_telemetry(key, driver, lap_number)
+    if telemetry is not None:
+        return telemetry
+
+    state = _SESSION_STATE.get(session)
+    if not isinstance(session, StoredSession) and (state is None or 'telemetry' in state['parts']):
+        # The session already holds its telemetry
+        return load_lap_telemetry(session, driver, lap_number)
+
+    # Otherwise the car data of the whole session is loaded just for this
+    # lap. The full session is not pooled, and such loads run one at a
+    # time so concurrent digests never hold several full sessions
+    with _DIGEST_FULL_LOAD_LOCK:
+        full = _load_fastf1_session(key, ('laps', 'telemetry'))
+        return load_lap_telemetry(full, driver, lap_number)
+
+def _build_session_digest(key):
+    # Lap timing goes through the session pool (single-flight, and the
+    # derived store when the session is stored); the digest itself keeps no
+    # reference to the session
+    session = load_session(*key, parts=DIGEST_PARTS)
+    if session is None:
+        return None
+
+    summary = load_session_summary(session)
+    telemetry = None
+    if summary.fastest_driver is not None:
+        telemetry = _fastest_lap_telemetry(session, key, summary.fastest_driver, summary.fastest_lap_number)
+    return SessionDigest(session_label(key), summary, session.laps, telemetry)
+
+def load_session_digest(year, gp, session_type):
+    """
+    Return the SessionDigest of a session (None if it cannot be loaded).
+    """
+    key = (year, gp, session_type)
+    with span('session_digest', key=key):
+        return DIGEST_CACHE.get_or_load(key, lambda: _build_session_digest(key))
+
+def load_session_digests(keys, max_workers=None):
+    """
+    Return the SessionDigest of each (year, gp, session_type) key, in order
+    (None for sessions that failed), building missing ones concurrently.
+    """
+    def load(key):
+        try:
+            return load_session_digest(*key)
+        except Exception as e:
+            print(f"Error loading session digest {key}: {e}")
+            return None
+
+    keys = list(keys)
+    if not keys:
+        return []
+    workers = max(1, min(max_workers or COMPARISON_WORKERS, len(keys)))
+    # Comparison loads are user-facing, so background prefetches wait for them
+    with span('load_session_digests', sessions=len(keys), workers=workers), PREFETCHER.foreground():
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='digest') as pool:
+            return list(pool.map(bind(load), keys))
+
+def load_circuit_corners(session):
+    """
+    Return the corner table (X, Y, Number, ...) for the session's circuit, or None.
+    Cached per circuit so it is not refetched on every rerun.
+    """
+    key = session_key(session)
+    circuit = key[:2] if key is not None else None
+    with _CORNERS_LOCK:
+        if circuit is not None and circuit in _CORNERS_CACHE:
+            return _CORNERS_CACHE[circuit]
+
+    circuit_info = session.get_circuit_info()
+    corners = circuit_info.corners if circuit_info is not None else None
+
+    if circuit is not None and corners is not None:
+        with _CORNERS_LOCK:
+            _CORNERS_CACHE[circuit] = corners
+    return corners
+
+def _get_executor(max_workers):
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='telemetry')
+            _EXECUTORS[max_workers] = executor
+        return executor
+
+@traced()
+def load_telemetry_batch(session, laps, max_workers=None, lap_range=None):
+    """
+    Load telemetry for many (driver, lap_number) pairs concurrently.
+
+    lap_number may be None for the driver's fastest lap (within lap_range, if
+    given). Returns a list in the same order as laps; entries that are missing
+    or fail to load are None and do not affect the others. Workers are threads
+    sharing the session, since a lap's telemetry (driver ahead included) is
+    built from the whole session's car and position data.
+    """
+    max_workers = max_workers or TELEMETRY_WORKERS
+
+    results = [None] * len(laps)
+    futures = {}
+    pool = _get_executor(max_workers)
+    window = lap_window(session, lap_range)
+    for i, (driver, lap_number) in enumerate(laps):
+        if lap_number is None and window is not None:
+            # Resolve the window's fastest lap here, so workers get a plain lap number
+            lap = _pick_window_lap(session, driver, None, window)
+            if lap is None:
+                continue
+            lap_number = int(lap['LapNumber'])
+        futures[pool.submit(bind(load_lap_telemetry), session, driver, lap_number)] = i
+
+    for future, i in futures.items():
+        try:
+            results[i] = future.result()
+        except Exception as e:
+            print(f"Error loading telemetry for {laps[i][0]}: {e}")
+
+    return results
@@ -0,0 +1,277 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pandas as pd
+
+from utils.processing import SessionSummary
+
+# Bump whenever the layout or the meaning of stored columns changes; entries
+# written under another version (or another FastF1 release) are discarded.
+STORE_VERSION = 2
+
+MANIFEST = 'manifest.json'
+
+
+# FastF1 and pyarrow are imported where they are used, so importing the store
+# (and utils.data_loader) stays cheap until a session is loaded
+
+
+def _stamp():
+    import fastf1
+    return {'store_version': STORE_VERSION, 'fastf1_version': fastf1.__version__}
+
+
+def _slug(value):
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', str(value))
+
+
+def _to_arrow(df):
+    import pyarrow as pa
+    df = pd.DataFrame(df).reset_index(drop=True)
+    for col in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-type object columns (e.g. bool/str) are stored as strings
+            df[col] = df[col].astype('string')
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+@contextmanager
+def _replacing(path):
+    """
+    Yield a unique temporary path next to path, moved over path on success.
+    Concurrent writers of one file (threads or processes) each get their own.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp', dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_arrow(path, table, compression=None):
+    import pyarrow as pa
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with _replacing(path) as tmp:
+        with pa.OSFile(tmp, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+
+
+def _write_table(path, df):
+    _write_arrow(path, _to_arrow(df))
+
+
+def _read_table(path):
+    # Uncompressed Arrow IPC files are memory-mapped, so numeric columns are
+    # handed to pandas without being read or copied up front; compressed
+    # (cold) entries are decompressed transparently on read
+    import pyarrow as pa
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+class StoredSession:
+    """
+    Read-only stand-in for a FastF1 Session restored from the derived store.
+
+    It exposes the laps, results and circuit corners the components use;
+    telemetry is served per lap by utils.data_loader.load_lap_telemetry.
+    """
+
+    def __init__(self, key, laps, results, corners):
+        self.key = key
+        self.name = key[2]
+        from fastf1.core import Laps
+        self.laps = Laps(laps, session=self)
+        self.results = results
+        self._corners = corners
+        # Full FastF1 session, only loaded when data missing from the store is needed
+        self.backing = None
+        self.backing_lock = threading.Lock()
+
+    def get_circuit_info(self):
+        if self._corners is None:
+            return None
+        return SimpleNamespace(corners=self._corners)
+
+
+class DerivedStore:
+    """
+    Columnar on-disk store of data derived from loaded sessions.
+
+    Each session gets a directory holding laps, results, corners and any
+    per-lap telemetry extracted so far as Arrow IPC files, plus a manifest
+    with the version stamp the entry was written under.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def entry_dir(self, key):
+        return os.path.join(self.root, *(_slug(part) for part in key))
+
+    def _read_manifest(self, key):
+        path = os.path.join(self.entry_dir(key), MANIFEST)
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if {k: manifest.get(k) for k in _stamp()} != _stamp():
+            self.invalidate(key)
+            return None
+        return manifest
+
+    def _write_manifest(self, key, manifest):
+        path = os.path.join(self.entry_dir(key), MANIFEST)
+        with _replacing(path) as tmp:
+            with open(tmp, 'w') as f:
+                json.dump(manifest, f)
+
+    def has_session(self, key):
+        return self._read_manifest(key) is not None
+
+    def fingerprint(self, key):
+        """
+        Identify the stored data of a session (None if not stored); it changes
+        when the entry is rewritten, not when it is compressed or summarised.
+        """
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            return None
+        return '|'.join(f"{k}={manifest.get(k)}" for k in sorted(manifest) if k not in ('compression', 'summary'))
+
+    def write_session(self, key, session):
+        """
+        Persist laps, results and circuit corners of a loaded FastF1 session.
+        """
+        entry = self.entry_dir(key)
+        os.makedirs(os.path.join(entry, 'telemetry'), exist_ok=True)
+
+        _write_table(os.path.join(entry, 'laps.arrow'), session.laps)
+        _write_table(os.path.join(entry, 'results.arrow'), session.results)
+
+        has_corners = False
+        try:
+            circuit_info = session.get_circuit_info()
+        except Exception:
+            circuit_info = None
+        if circuit_info is not None:
+            _write_table(os.path.join(entry, 'corners.arrow'), circuit_info.corners)
+            has_corners = True
+
+        self._write_manifest(key, dict(_stamp(), has_corners=has_corners, written_at=time.time()))
+
+    def read_session(self, key):
+        """
+        Return a StoredSession for key, or None if there is no valid entry.
+        """
+        import pyarrow as pa
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            return None
+
+        entry = self.entry_dir(key)
+        try:
+            laps = _read_table(os.path.join(entry, 'laps.arrow'))
+            results = _read_table(os.path.join(entry, 'results.arrow'))
+            corners = None
+            if manifest.get('has_corners'):
+                corners = _read_table(os.path.join(entry, 'corners.arrow'))
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"Discarding unreadable store entry {key}: {e}")
+            self.invalidate(key)
+            return None
+
+        return StoredSession(key, laps, results, corners)
+
+    def write_summary(self, key, summary):
+        """
+        Persist the SessionSummary of a stored session next to its laps.
+        """
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            return
+        entry = self.entry_dir(key)
+        scalars, stints, quantiles = summary.to_frames()
+        _write_table(os.path.join(entry, 'summary_stints.arrow'), stints)
+        _write_table(os.path.join(entry, 'summary_quantiles.arrow'), quantiles)
+        self._write_manifest(key, dict(manifest, summary=scalars))
+
+    def read_summary(self, key):
+        """
+        Return the stored SessionSummary for key, or None.
+        """
+        import pyarrow as pa
+        manifest = self._read_manifest(key)
+        if manifest is None or 'summary' not in manifest:
+            return None
+        entry = self.entry_dir(key)
+        try:
+            stints = _read_table(os.path.join(entry, 'summary_stints.arrow'))
+            quantiles = _read_table(os.path.join(entry, 'summary_quantiles.arrow'))
+        except (OSError, pa.ArrowInvalid):
+            return None
+        return SessionSummary.restore(manifest['summary'], stints, quantiles)
+
+    def _telemetry_path(self, key, driver, lap_number):
+        return os.path.join(self.entry_dir(key), 'telemetry', f"{_slug(driver)}_{int(lap_number)}.arrow")
+
+    def write_lap_telemetry(self, key, driver, lap_number, telemetry):
+        if not self.has_session(key):
+            return
+        _write_table(self._telemetry_path(key, driver, lap_number), telemetry)
+
+    def read_lap_telemetry(self, key, driver, lap_number):
+        import pyarrow as pa
+        path = self._telemetry_path(key, driver, lap_number)
+        if not os.path.exists(path) or not self.has_session(key):
+            return None
+        try:
+            return _read_table(path)
+        except (OSError, pa.ArrowInvalid):
+            return None
+
+    def compress(self, key, codec='zstd'):
+        """
+        Rewrite the Arrow files of an entry with codec compression.
+        Returns the number of bytes saved.
+        """
+        import pyarrow as pa
+        manifest = self._read_manifest(key)
+        if manifest is None or manifest.get('compression') == codec:
+            return 0
+
+        saved = 0
+        for root, _, files in os.walk(self.entry_dir(key)):
+            for name in files:
+                if not name.endswith('.arrow'):
+                    continue
+                path = os.path.join(root, name)
+                before = os.path.getsize(path)
+                with pa.OSFile(path, 'rb') as source:
+                    table = pa.ipc.open_file(source).read_all()
+                _write_arrow(path, table, compression=codec)
+                saved += before - os.path.getsize(path)
+
+        self._write_manifest(key, dict(manifest, compression=codec))
+        return saved
+
+    def invalidate(self, key):
+        shutil.rmtree(self.entry_dir(key), ignore_errors=True)
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+def minmax_indices(values, n_buckets):
+    """
+    Indices of the minimum and maximum sample in each of n_buckets equal-width buckets.
+    Keeps peaks and troughs (e.g. apex speeds) that plain decimation would drop.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n_buckets <= 0 or n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)  # ceil division
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = values
+    buckets = padded.reshape(n_buckets, size)
+
+    offsets = np.arange(n_buckets) * size
+    nan = np.isnan(buckets)
+    lows = np.where(nan, np.inf, buckets).argmin(axis=1) + offsets
+    highs = np.where(nan, -np.inf, buckets).argmax(axis=1) + offsets
+
+    idx = np.concatenate([lows, highs])
+    return np.unique(idx[idx < n])
+
+
+def change_indices(values):
+    """
+    Indices on both sides of every change in a discrete channel (gear, brake, DRS).
+    """
+    values = np.asarray(values)
+    if len(values) < 2:
+        return np.arange(len(values))
+    changed = np.flatnonzero(values[1:] != values[:-1])
+    return np.unique(np.concatenate([changed, changed + 1]))
+
+
+def downsample_frame(frame, max_points, channels, keep_changes=('Brake', 'nGear')):
+    """
+    Reduce a telemetry frame to roughly max_points rows shared by all channels.
+
+    Each continuous channel contributes its per-bucket minima and maxima and
+    every transition of the keep_changes channels is retained, so braking
+    points and gear changes survive even when that exceeds the budget.
+    """
+    n = len(frame)
+    if max_points is None or n <= max_points:
+        return frame
+
+    channels = [c for c in channels if c in frame.columns]
+    n_buckets = max(1, max_points // (2 * max(1, len(channels))))
+
+    parts = [np.array([0, n - 1])]
+    for channel in channels:
+        parts.append(minmax_indices(frame[channel].to_numpy(dtype=float), n_buckets))
+    for channel in keep_changes:
+        if channel in frame.columns:
+            parts.append(change_indices(frame[channel].to_numpy()))
+
+    return frame.iloc[np.unique(np.concatenate(parts))]
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Columns of the lap explorer; the time columns are shown formatted
+LAP_TABLE_COLUMNS = ['Driver', 'LapNumber', 'LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time',
+                     'Compound', 'Stint', 'TyreLife']
+TIME_COLUMNS = ['LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time']
+
+# Suffix of the hidden numeric columns the formatted time columns are sorted by
+SORT_SUFFIX = '__seconds'
+
+
+def _time_of_day(chars, width):
+    # Fixed-width slice after 'YYYY-MM-DDT', reinterpreted as one string per row
+    return np.ascontiguousarray(chars[:, 11:11 + width]).view(f'U{width}').ravel()
+
+
+def format_timedelta(series):
+    """
+    Format a Timedelta series as HH:MM:SS[.ffffff] (str(Timedelta) without the
+    days part) with array operations only; missing values become ''.
+    """
+    missing = series.isna().to_numpy()
+    ns = np.where(missing, 0, series.to_numpy(dtype='timedelta64[ns]').astype(np.int64))
+
+    # Durations as timestamps after the epoch: NumPy formats them in C and the
+    # time of day is a fixed-width slice of the result
+    text = np.datetime_as_string(ns.view('datetime64[ns]'), unit='ns').astype('U29')
+    chars = text.view('U1').reshape(len(text), 29)
+
+    # Like str(Timedelta): microseconds if there are any, nanoseconds only when needed
+    frac = ns % 1_000_000_000
+    formatted = np.where(
+        frac % 1000 != 0, _time_of_day(chars, 18),
+        np.where(frac != 0, _time_of_day(chars, 15), _time_of_day(chars, 8))
+    )
+    return pd.Series(np.where(missing, '', formatted), index=series.index, dtype=object)
+
+
+def build_lap_table(laps):
+    """
+    Build the lap explorer frame: LAP_TABLE_COLUMNS with the times formatted,
+    plus hidden numeric copies of the time columns for sorting.
+    """
+    table = pd.DataFrame({col: laps[col] for col in LAP_TABLE_COLUMNS if col in laps.columns})
+    for col in TIME_COLUMNS:
+        if col in table.columns:
+            table[col + SORT_SUFFIX] = laps[col].dt.total_seconds()
+            table[col] = format_timedelta(laps[col])
+    return table.reset_index(drop=True)
+
+
+def lap_table_page(table, drivers=None, compounds=None, stints=None, lap_range=None,
+                   sort_by='LapNumber', ascending=True, page=0, page_size=50):
+    """
+    Filter and sort the lap explorer frame and cut out one page (pages past
+    the end show the last page). Returns (page frame without the hidden sort
+    columns, number of matching rows).
+    """
+    mask = np.ones(len(table), dtype=bool)
+    if drivers:
+        mask &= table['Driver'].isin(drivers).to_numpy()
+    if compounds:
+        mask &= table['Compound'].isin(compounds).to_numpy()
+    if stints:
+        mask &= table['Stint'].isin(stints).to_numpy()
+    if lap_range is not None:
+        mask &= table['LapNumber'].between(*lap_range).to_numpy()
+    rows = table[mask]
+
+    key = sort_by + SORT_SUFFIX if sort_by + SORT_SUFFIX in rows.columns else sort_by
+    # Stable sort so ties keep the driver/lap order; missing values go last
+    rows = rows.sort_values(key, ascending=ascending, kind='stable', na_position='last')
+
+    last_page = max(0, (len(rows) - 1) // page_size)
+    start = min(page, last_page) * page_size
+    visible = rows.iloc[start:start + page_size]
+    return visible[[col for col in visible.columns if not col.endswith(SORT_SUFFIX)]], len(rows)
@@ -0,0 +1,134 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+def _lower_priority():
+    # Linux schedules threads individually, so this only lowers the prefetch
+    # workers; elsewhere they simply run at normal priority
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+class Prefetcher:
+    """
+    Loads keys in the background on a small, low-priority worker pool.
+
+    At most max_pending keys wait in the queue (the oldest are dropped) and
+    at most max_workers load at once. Workers do not start a load while a
+    foreground load is running (see foreground()). Each queued key remembers
+    who requested it, so one requester cancelling its prefetches leaves the
+    keys other requesters still want queued.
+    """
+
+    def __init__(self, load, max_workers=1, max_pending=4):
+        self._load = load
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='prefetch', initializer=_lower_priority
+        )
+        self._futures = OrderedDict()  # key -> Future, pending or running
+        self._requesters = {}  # key -> requesters still waiting for it
+        self._running = set()
+        self._lock = threading.Lock()
+        self._foreground = 0
+        self._idle = threading.Condition(self._lock)
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    @contextmanager
+    def foreground(self):
+        """
+        Mark a user-facing load; prefetch workers wait until none is running.
+        """
+        with self._lock:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._foreground -= 1
+                if not self._foreground:
+                    self._idle.notify_all()
+
+    def schedule(self, keys, requester=None):
+        """
+        Queue keys for prefetching on behalf of requester (keys already queued
+        or running are not queued twice).
+        """
+        with self._lock:
+            for key in keys:
+                self._requesters.setdefault(key, set()).add(requester)
+                if key in self._futures:
+                    continue
+                self._futures[key] = self._executor.submit(self._run, key)
+            self._trim()
+
+    def _trim(self):
+        pending = [key for key in self._futures if key not in self._running]
+        for key in pending[:max(0, len(pending) - self.max_pending)]:
+            self._drop(key)
+
+    def _drop(self, key):
+        if self._futures[key].cancel():
+            del self._futures[key]
+            self._requesters.pop(key, None)
+            self.cancelled += 1
+
+    def cancel(self, requester=None, keep=()):
+        """
+        Withdraw requester's queued prefetches except those in keep. A key is
+        cancelled once no other requester waits for it; running loads finish.
+        """
+        with self._lock:
+            for key in list(self._futures):
+                requesters = self._requesters.get(key, set())
+                if key in keep or requester not in requesters:
+                    continue
+                requesters.discard(requester)
+                if not requesters and key not in self._running:
+                    self._drop(key)
+
+    def _run(self, key):
+        with self._lock:
+            while self._foreground:
+                self._idle.wait()
+            self._running.add(key)
+        try:
+            result = self._load(key)
+        except Exception as e:
+            print(f"Error prefetching {key}: {e}")
+            result = None
+        with self._lock:
+            self._running.discard(key)
+            self._futures.pop(key, None)
+            self._requesters.pop(key, None)
+            if result is None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        return result
+
+    def status(self, key):
+        """
+        'running', 'queued' or None.
+        """
+        with self._lock:
+            if key in self._running:
+                return 'running'
+            return 'queued' if key in self._futures else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': len(self._futures) - len(self._running),
+                'running': len(self._running),
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+            }
@@ -1,34 +1,507 @@
 import pandas as pd
 import numpy as np
 
-def calculate_overtakes(laps):
+def calculate_overtakes(laps, events=None):
     """
-    Calculate overtakes based on position changes.
-    Returns a DataFrame of overtakes.
+    Calculate on-track overtakes based on position changes.
+    Returns a DataFrame of the laps on which a driver passed at least one car,
+    with PositionChange and the event counts from PositionEvents.
+    Position gains from pit stops and retirements are not counted.
+    The input laps are not modified.
     """
-    # Ensure laps are sorted by lap number
-    laps = laps.sort_values(by=['Driver', 'LapNumber'])
-    
-    # Calculate position difference
-    laps['PositionChange'] = laps.groupby('Driver')['Position'].diff()
-    
-    # Identify overtakes (negative change means improved position, e.g., 5 -> 4 is -1)
-    overtakes = laps[laps['PositionChange'] < 0]
-    
-    return overtakes
+    if events is None:
+        events = PositionEvents(laps)
+    passes = events.to_frame()
+    passes = passes[passes['Passes'] > 0].drop(columns='Position')
 
-def calculate_gap(laps, driver1, driver2):
+    overtakes = pd.DataFrame(laps).merge(passes, on=['Driver', 'LapNumber'], how='inner')
+    return overtakes.sort_values(by=['Driver', 'LapNumber']).reset_index(drop=True)
+
+def calculate_gap(laps, driver1, driver2, engine=None):
     """
     Calculate the gap between two drivers over the race.
     Returns a DataFrame with LapNumber and Gap.
+    Pass a prebuilt GapEngine to avoid rebuilding the time matrix for every pair.
+    """
+    if engine is None:
+        engine = GapEngine(laps)
+    return engine.pair_gap(driver1, driver2)
+
+class GapEngine:
+    """
+    Lap x driver matrix of session time at the end of each lap.
+
+    Built once from the laps frame; every gap view is then an array operation
+    on the matrix instead of a merge per driver pair.
+    """
+
+    def __init__(self, laps):
+        lap_numbers, lap_idx = np.unique(laps['LapNumber'].to_numpy(dtype=float), return_inverse=True)
+        drivers, driver_idx = np.unique(laps['Driver'].to_numpy(dtype=str), return_inverse=True)
+
+        times = np.full((len(lap_numbers), len(drivers)), np.nan)
+        times[lap_idx, driver_idx] = laps['Time'].dt.total_seconds().to_numpy()
+
+        self.lap_numbers = lap_numbers
+        self.drivers = list(drivers)
+        self.times = times
+        self._column = {driver: i for i, driver in enumerate(self.drivers)}
+
+    def _frame(self, values):
+        frame = pd.DataFrame(values, index=self.lap_numbers, columns=self.drivers)
+        frame.index.name = 'LapNumber'
+        return frame
+
+    def gap_to_reference(self, reference):
+        """
+        Gap of every driver to the reference driver in seconds (positive = reference ahead).
+        """
+        return self._frame(self.times - self.times[:, [self._column[reference]]])
+
+    def gap_to_leader(self):
+        """
+        Gap of every driver to the first car to complete each lap.
+        """
+        leader = np.where(np.isnan(self.times), np.inf, self.times).min(axis=1, keepdims=True)
+        return self._frame(self.times - leader)
+
+    def interval_to_car_ahead(self):
+        """
+        Gap of every driver to the car directly ahead of them on each lap (0 for the leader).
+        """
+        order = np.argsort(self.times, axis=1)  # NaN (not completed) sorts last
+        ordered = np.take_along_axis(self.times, order, axis=1)
+        intervals_ordered = np.diff(ordered, axis=1, prepend=np.nan)
+        intervals_ordered[:, 0] = np.where(np.isnan(ordered[:, 0]), np.nan, 0.0)
+
+        intervals = np.empty_like(self.times)
+        np.put_along_axis(intervals, order, intervals_ordered, axis=1)
+        return self._frame(intervals)
+
+    def all_pairs(self):
+        """
+        Array of shape (laps, drivers, drivers) where [l, i, j] is driver i's time minus driver j's.
+        """
+        return self.times[:, :, None] - self.times[:, None, :]
+
+    def pair_gap(self, driver1, driver2):
+        """
+        Gap between two drivers on the laps both completed (driver1 time - driver2 time).
+        """
+        gap = self.times[:, self._column[driver1]] - self.times[:, self._column[driver2]]
+        valid = ~np.isnan(gap)
+        return pd.DataFrame({'LapNumber': self.lap_numbers[valid], 'Gap': gap[valid]})
+
+
+class PositionEvents:
+    """
+    Lap x driver int8 position matrix with every position gain classified.
+
+    A driver moving ahead of another car between consecutive laps counts as
+    an on-track pass, unless either car was on an in- or out-lap (pit-cycle
+    gain). Cars ahead that stop being classified for the rest of the session
+    count as retirement gains.
+    """
+
+    def __init__(self, laps):
+        lap_numbers, lap_idx = np.unique(laps['LapNumber'].to_numpy(dtype=float), return_inverse=True)
+        drivers, driver_idx = np.unique(laps['Driver'].to_numpy(dtype=str), return_inverse=True)
+        shape = (len(lap_numbers), len(drivers))
+
+        # 0 marks laps without a classified position
+        position = laps['Position'].to_numpy(dtype=float)
+        valid = ~np.isnan(position)
+        positions = np.zeros(shape, dtype=np.int8)
+        positions[lap_idx[valid], driver_idx[valid]] = position[valid]
+
+        in_pit = np.zeros(shape, dtype=bool)
+        in_pit[lap_idx, driver_idx] = (laps['PitInTime'].notna() | laps['PitOutTime'].notna()).to_numpy()
+
+        self.lap_numbers = lap_numbers
+        self.drivers = list(drivers)
+        self.positions = positions
+        self.in_pit = in_pit
+        self.passes, self.pit_gains, self.retirement_gains = self._classify()
+
+    def _classify(self):
+        positions = self.positions
+        valid = positions > 0
+        prev, cur = positions[:-1], positions[1:]
+        prev_valid, cur_valid = valid[:-1], valid[1:]
+
+        # [l, i, j]: car j was ahead of car i before lap l+1 / is behind it after
+        was_ahead = prev_valid[:, :, None] & prev_valid[:, None, :] & (prev[:, None, :] < prev[:, :, None])
+        now_behind = cur_valid[:, :, None] & cur_valid[:, None, :] & (cur[:, None, :] > cur[:, :, None])
+        gained = was_ahead & now_behind
+
+        pit = self.in_pit[1:]
+        pit_pair = pit[:, :, None] | pit[:, None, :]
+
+        # A car retires on the first lap after which it is never classified again
+        classified_later = np.logical_or.accumulate(valid[::-1], axis=0)[::-1][1:]
+        retired = prev_valid & ~classified_later
+        retirement = was_ahead & retired[:, None, :] & cur_valid[:, :, None]
+
+        zeros = np.zeros((1, positions.shape[1]), dtype=np.int16)
+        counts = [
+            (gained & ~pit_pair).sum(axis=2),
+            (gained & pit_pair).sum(axis=2),
+            retirement.sum(axis=2),
+        ]
+        return [np.vstack([zeros, c.astype(np.int16)]) for c in counts]
+
+    def to_frame(self):
+        """
+        One row per (lap, driver) with a position gain, with PositionChange
+        and the number of Passes, PitGains and RetirementGains.
+        """
+        positions = self.positions.astype(np.int16)
+        change = np.zeros_like(positions)
+        both = (positions[1:] > 0) & (positions[:-1] > 0)
+        change[1:] = np.where(both, positions[1:] - positions[:-1], 0)
+
+        lap, driver = np.nonzero(self.passes + self.pit_gains + self.retirement_gains)
+        return pd.DataFrame({
+            'LapNumber': self.lap_numbers[lap],
+            'Driver': np.asarray(self.drivers, dtype=object)[driver],
+            'Position': positions[lap, driver],
+            'PositionChange': change[lap, driver],
+            'Passes': self.passes[lap, driver],
+            'PitGains': self.pit_gains[lap, driver],
+            'RetirementGains': self.retirement_gains[lap, driver],
+        })
+
+
+class LapComparison:
+    """
+    Several laps resampled onto one common distance grid.
+
+    All laps are interpolated in one np.interp call per channel (the laps are
+    laid end to end with a distance offset each), so delta-time and channel
+    differences are plain array operations on a (laps, points) block.
+    """
+
+    def __init__(self, telemetries, labels, channels=('Speed', 'RPM', 'Throttle', 'Brake', 'nGear'), step=2.0):
+        distances = [np.maximum.accumulate(tel['Distance'].to_numpy(dtype=float)) for tel in telemetries]
+        # Compare over the distance every lap covers
+        start = max(d[0] for d in distances)
+        end = min(d[-1] for d in distances)
+        self.distance = np.arange(start, end, step)
+        self.labels = list(labels)
+
+        offsets = np.arange(len(distances)) * (max(d[-1] for d in distances) + 1.0)
+        xp = np.concatenate([d + offset for d, offset in zip(distances, offsets)])
+        x = (self.distance[None, :] + offsets[:, None]).ravel()
+        shape = (len(distances), len(self.distance))
+
+        def resample(column):
+            fp = np.concatenate([column(tel) for tel in telemetries])
+            return np.interp(x, xp, fp).reshape(shape)
+
+        self.time = resample(lambda tel: tel['Time'].dt.total_seconds().to_numpy())
+        self.channels = {
+            channel: resample(lambda tel: tel[channel].to_numpy(dtype=float))
+            for channel in channels if all(channel in tel.columns for tel in telemetries)
+        }
+        self._row = {label: i for i, label in enumerate(self.labels)}
+
+    def delta_time(self, reference=0):
+        """
+        Cumulative time difference to the reference lap (label or row) at every
+        grid point, shape (laps, points); positive = slower than the reference.
+        """
+        ref = self._row.get(reference, reference)
+        return self.time - self.time[ref]
+
+    def channel_diff(self, channel, reference=0):
+        """
+        Difference of a channel to the reference lap at every grid point.
+        """
+        ref = self._row.get(reference, reference)
+        values = self.channels[channel]
+        return values - values[ref]
+
+# Lap-time quantiles kept per driver by SessionSummary
+LAP_TIME_QUANTILES = {'Min': 0.0, 'Q1': 0.25, 'Median': 0.5, 'Q3': 0.75, 'Max': 1.0}
+
+class SessionSummary:
+    """
+    Aggregates of a session's laps and results that the components read on
+    every rerun: fastest lap, lap count, drivers, finishing order, the stint
+    table and per-driver lap-time quantiles.
+
+    Built once from the laps (and restored from the derived store afterwards)
+    instead of scanning the laps frame in each component.
     """
-    d1_laps = laps.pick_drivers(driver1)
-    d2_laps = laps.pick_drivers(driver2)
-    
-    # Merge on LapNumber
-    merged = pd.merge(d1_laps[['LapNumber', 'Time']], d2_laps[['LapNumber', 'Time']], on='LapNumber', suffixes=(f'_{driver1}', f'_{driver2}'))
-    
-    # Calculate gap (Time delta)
-    merged['Gap'] = (merged[f'Time_{driver1}'] - merged[f'Time_{driver2}']).dt.total_seconds()
-    
-    return merged[['LapNumber', 'Gap']]
+
+    def __init__(self, laps, results):
+        lap_numbers = laps['LapNumber']
+        self.lap_count = int(lap_numbers.max()) if lap_numbers.notna().any() else 0
+
+        self.fastest_lap_time = None
+        self.fastest_driver = None
+        self.fastest_lap_number = None
+        fastest = laps.pick_fastest() if len(laps) else None
+        if fastest is not None and pd.notna(fastest['LapTime']):
+            self.fastest_lap_time = fastest['LapTime'].total_seconds()
+            self.fastest_driver = str(fastest['Driver'])
+            self.fastest_lap_number = int(fastest['LapNumber'])
+
+        abbreviations = results['Abbreviation'].dropna().astype(str)
+        self.drivers = sorted(abbreviations.unique())
+        self.finishing_order = abbreviations.tolist()
+
+        self.stints = laps.groupby(['Driver', 'Stint', 'Compound'], observed=True).agg(
+            StartLap=('LapNumber', 'min'),
+            EndLap=('LapNumber', 'max'),
+            LapsRun=('LapNumber', 'count')
+        ).reset_index()
+
+        lap_times = pd.DataFrame({
+            'Driver': laps['Driver'].astype(str),
+            'LapTimeSeconds': laps['LapTime'].dt.total_seconds()
+        }).dropna()
+        quantiles = lap_times.groupby('Driver')['LapTimeSeconds'].quantile(list(LAP_TIME_QUANTILES.values()))
+        self.lap_time_quantiles = quantiles.unstack().set_axis(list(LAP_TIME_QUANTILES), axis=1)
+
+    @classmethod
+    def restore(cls, scalars, stints, lap_time_quantiles):
+        """
+        Rebuild a summary from the output of to_frames().
+        """
+        summary = cls.__new__(cls)
+        summary.__dict__.update(scalars)
+        summary.stints = stints
+        summary.lap_time_quantiles = lap_time_quantiles.set_index('Driver')
+        return summary
+
+    def to_frames(self):
+        """
+        Return (scalars, stints, lap_time_quantiles) for storage.
+        """
+        scalars = {
+            name: getattr(self, name)
+            for name in ('lap_count', 'fastest_lap_time', 'fastest_driver', 'fastest_lap_number',
+                         'drivers', 'finishing_order')
+        }
+        return scalars, self.stints, self.lap_time_quantiles.rename_axis('Driver').reset_index()
+
+class ReplayTimeline:
+    """
+    Lap x driver matrices of everything a race replay shows (positions,
+    end-of-lap session time, lap times, stint, compound and tyre life).
+
+    Built once per session and shared; each replay keeps its own RaceReplay
+    cursor over it.
+    """
+
+    def __init__(self, laps):
+        lap_numbers, lap_idx = np.unique(laps['LapNumber'].to_numpy(dtype=float), return_inverse=True)
+        drivers, driver_idx = np.unique(laps['Driver'].to_numpy(dtype=str), return_inverse=True)
+        shape = (len(lap_numbers), len(drivers))
+
+        def matrix(values):
+            out = np.full(shape, np.nan)
+            out[lap_idx, driver_idx] = values
+            return out
+
+        self.lap_numbers = lap_numbers
+        self.drivers = list(drivers)
+        self.positions = matrix(laps['Position'].to_numpy(dtype=float))
+        self.times = matrix(laps['Time'].dt.total_seconds().to_numpy())
+        self.lap_times = matrix(laps['LapTime'].dt.total_seconds().to_numpy())
+        self.stints = matrix(laps['Stint'].to_numpy(dtype=float))
+        self.tyre_life = matrix(laps['TyreLife'].to_numpy(dtype=float))
+
+        # Compounds as codes into compound_names (-1 = unknown)
+        compounds = pd.Categorical(laps['Compound'].astype(object))
+        self.compound_names = list(compounds.categories)
+        self.compounds = np.full(shape, -1, dtype=np.int8)
+        self.compounds[lap_idx, driver_idx] = compounds.codes
+
+
+class RaceReplay:
+    """
+    Cursor stepping through a ReplayTimeline one lap at a time.
+
+    Each step appends only the new lap to the running state (gaps, intervals,
+    stints, lap times), so a tick costs O(drivers); seeking backwards replays
+    from the start.
+    """
+
+    def __init__(self, timeline):
+        self.timeline = timeline
+        self.reset()
+
+    def reset(self):
+        shape = self.timeline.times.shape
+        self.lap = 0  # number of laps applied
+        self.gap_to_leader = np.full(shape, np.nan)
+        self.intervals = np.full(shape, np.nan)
+        self.lap_times = [[] for _ in self.timeline.drivers]
+        self.closed_stints = []
+        self._open_stints = [None] * len(self.timeline.drivers)
+
+    @property
+    def finished(self):
+        return self.lap >= len(self.timeline.lap_numbers)
+
+    @property
+    def lap_number(self):
+        """
+        Lap number of the last applied lap (None before the first step).
+        """
+        return int(self.timeline.lap_numbers[self.lap - 1]) if self.lap else None
+
+    def step(self):
+        """
+        Apply the next lap; returns False once the session is finished.
+        """
+        if self.finished:
+            return False
+        timeline, row = self.timeline, self.lap
+
+        times = timeline.times[row]
+        completed = ~np.isnan(times)
+        if completed.any():
+            self.gap_to_leader[row] = times - times[completed].min()
+            order = np.argsort(times)  # NaN (not completed) sorts last
+            ordered = times[order]
+            intervals = np.diff(ordered, prepend=np.nan)
+            intervals[0] = 0.0
+            self.intervals[row, order] = intervals
+
+        lap_number = timeline.lap_numbers[row]
+        for d in range(len(timeline.drivers)):
+            lap_time = timeline.lap_times[row, d]
+            if not np.isnan(lap_time):
+                self.lap_times[d].append(lap_time)
+
+            stint, compound = timeline.stints[row, d], timeline.compounds[row, d]
+            if np.isnan(stint):
+                continue
+            current = self._open_stints[d]
+            if current is not None and (current[0] != stint or current[1] != compound):
+                self.closed_stints.append((d, *current))
+                current = None
+            if current is None:
+                self._open_stints[d] = [stint, compound, lap_number, lap_number, 1]
+            else:
+                current[3] = lap_number
+                current[4] += 1
+
+        self.lap += 1
+        return True
+
+    def seek(self, lap):
+        """
+        Move to lap applied laps (stepping forward, or replaying from the start).
+        """
+        if lap < self.lap:
+            self.reset()
+        while self.lap < lap and self.step():
+            pass
+
+    def positions(self):
+        """
+        Position matrix of the laps applied so far (laps x drivers).
+        """
+        return self.timeline.positions[:self.lap]
+
+    def standings(self):
+        """
+        Classification after the current lap: Position, Driver, Gap, Interval,
+        Compound, TyreLife and LastLap, ordered by position.
+        """
+        timeline, row = self.timeline, self.lap - 1
+        if row < 0:
+            return pd.DataFrame(columns=['Position', 'Driver', 'Gap', 'Interval', 'Compound', 'TyreLife', 'LastLap'])
+        names = np.asarray(timeline.compound_names + ['UNKNOWN'], dtype=object)
+        table = pd.DataFrame({
+            'Position': timeline.positions[row],
+            'Driver': timeline.drivers,
+            'Gap': self.gap_to_leader[row],
+            'Interval': self.intervals[row],
+            'Compound': names[timeline.compounds[row]],
+            'TyreLife': timeline.tyre_life[row],
+            'LastLap': timeline.lap_times[row],
+        })
+        return table.dropna(subset=['Position']).sort_values('Position').reset_index(drop=True)
+
+    def stint_table(self):
+        """
+        Stints so far (the open ones end at the current lap), like SessionSummary.stints.
+        """
+        names = self.timeline.compound_names + ['UNKNOWN']
+        rows = self.closed_stints + [(d, *s) for d, s in enumerate(self._open_stints) if s is not None]
+        return pd.DataFrame(
+            [(self.timeline.drivers[d], stint, names[compound], start, end, count)
+             for d, stint, compound, start, end, count in rows],
+            columns=['Driver', 'Stint', 'Compound', 'StartLap', 'EndLap', 'LapsRun']
+        )
+
+class MiniSectors:
+    """
+    Several laps split into n_segments equal-distance mini-sectors.
+
+    Segment times come from the distance-aligned time block of a LapComparison
+    in one vectorized pass over the (laps, boundaries) array; the owner of a
+    segment is the lap (driver) that covered it fastest.
+    """
+
+    def __init__(self, comparison, n_segments=25):
+        distance = comparison.distance
+        self.labels = list(comparison.labels)
+        self.boundaries = np.linspace(distance[0], distance[-1], n_segments + 1)
+
+        # Linear interpolation of every lap's time at the segment boundaries
+        position = np.interp(self.boundaries, distance, np.arange(len(distance), dtype=float))
+        lower = np.clip(np.floor(position).astype(int), 0, len(distance) - 2)
+        fraction = position - lower
+        times = comparison.time[:, lower] * (1 - fraction) + comparison.time[:, lower + 1] * fraction
+
+        self.segment_times = np.diff(times, axis=1)  # (laps, segments)
+        self.owner = self.segment_times.argmin(axis=0)
+        self.gap_to_best = self.segment_times - self.segment_times.min(axis=0)
+
+    def segment_of(self, distance):
+        """
+        Mini-sector index of each distance (clipped to the first/last segment).
+        """
+        index = np.searchsorted(self.boundaries, distance, side='right') - 1
+        return np.clip(index, 0, len(self.owner) - 1)
+
+    def owned_counts(self):
+        """
+        Number of mini-sectors owned by each label.
+        """
+        counts = np.bincount(self.owner, minlength=len(self.labels))
+        return dict(zip(self.labels, counts.tolist()))
+
+class SessionDigest:
+    """
+    Compact reduction of one session for cross-session comparison: its
+    SessionSummary, every timed lap (Driver, LapNumber, Compound,
+    LapTimeSeconds) and the session's fastest lap resampled onto a distance
+    grid. It holds no reference to the session itself.
+    """
+
+    def __init__(self, label, summary, laps, fastest_telemetry=None):
+        self.label = label
+        self.summary = summary
+        lap_times = pd.DataFrame({
+            'Driver': laps['Driver'].astype('category'),
+            'LapNumber': laps['LapNumber'].to_numpy(dtype=np.float32),
+            'Compound': laps['Compound'].astype('category'),
+            'LapTimeSeconds': laps['LapTime'].dt.total_seconds().to_numpy(dtype=np.float32),
+        })
+        self.lap_times = lap_times.dropna(subset=['LapTimeSeconds']).reset_index(drop=True)
+        self.fastest_lap = None
+        if fastest_telemetry is not None and len(fastest_telemetry) > 1:
+            self.fastest_lap = LapComparison([fastest_telemetry], [summary.fastest_driver])
+
+    def nbytes(self):
+        total = int(self.lap_times.memory_usage(deep=True).sum()) + int(self.summary.stints.memory_usage(deep=True).sum())
+        if self.fastest_lap is not None:
+            total += self.fastest_lap.time.nbytes * (2 + len(self.fastest_lap.channels))
+        return total
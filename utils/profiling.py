@@ -0,0 +1,192 @@
+import functools
+import json
+import os
+import threading
+import time
+
+# Optional file that every profiled rerun is appended to as JSON lines
+PROFILE_LOG = os.environ.get('F1_PROFILE_LOG')
+
+# Spans are only recorded on threads with an active run (see start_run);
+# everywhere else span() returns a shared no-op object.
+_local = threading.local()
+
+
+class Span:
+    """
+    One timed section of a rerun, with optional attributes and payload size.
+    """
+
+    __slots__ = ('name', 'attrs', 'start', 'duration', 'children', 'payload_bytes', '_payload')
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+        self.duration = None
+        self.children = []
+        self.payload_bytes = None
+        self._payload = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def payload(self, obj):
+        """
+        Record the serialized size of a figure (or any JSON-serializable object).
+        It is measured when the run ends, so serializing it is not timed.
+        """
+        self._payload = obj
+
+    def _measure(self):
+        if self._payload is not None:
+            obj, self._payload = self._payload, None
+            text = obj.to_json() if hasattr(obj, 'to_json') else json.dumps(obj, default=str)
+            self.payload_bytes = len(text)
+        for child in self.children:
+            child._measure()
+
+    def __enter__(self):
+        stack = _local.stack
+        stack[-1].children.append(self)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        _local.stack.pop()
+        return False
+
+
+class _NoopSpan:
+    def set(self, **attrs):
+        pass
+
+    def payload(self, obj):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **attrs):
+    """
+    Context manager timing a section of the current run (a no-op when profiling is off).
+    """
+    if not getattr(_local, 'stack', None):
+        return NOOP_SPAN
+    return Span(name, attrs)
+
+
+def traced(name=None):
+    """
+    Decorator recording each call of a function as a span.
+    """
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not getattr(_local, 'stack', None):
+                return func(*args, **kwargs)
+            with Span(label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind(func):
+    """
+    Wrap func so spans it records on a worker thread nest under the caller's current span.
+    """
+    stack = getattr(_local, 'stack', None)
+    if not stack:
+        return func
+    parent = stack[-1]
+
+    @functools.wraps(func)
+    def bound(*args, **kwargs):
+        _local.stack = [parent]
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.stack = None
+    return bound
+
+
+def run_active():
+    """
+    Whether spans are being collected on this thread.
+    """
+    return bool(getattr(_local, 'stack', None))
+
+
+def start_run(name='rerun', **attrs):
+    """
+    Start collecting spans on this thread; returns the root span.
+    """
+    root = Span(name, dict(attrs, started_at=time.strftime('%Y-%m-%dT%H:%M:%S')))
+    root.start = time.perf_counter()
+    _local.stack = [root]
+    return root
+
+
+def end_run():
+    """
+    Stop collecting spans on this thread and return the finished root span.
+    """
+    stack = getattr(_local, 'stack', None)
+    if not stack:
+        return None
+    root = stack[0]
+    root.duration = time.perf_counter() - root.start
+    _local.stack = None
+    root._measure()
+    if PROFILE_LOG:
+        with open(PROFILE_LOG, 'a') as f:
+            f.write(to_jsonl(root))
+    return root
+
+
+def flatten(root):
+    """
+    Depth-first list of span rows (depth, name, start and duration in ms, payload, attrs).
+    """
+    rows = []
+
+    def visit(node, depth):
+        rows.append({
+            'depth': depth,
+            'name': node.name,
+            'start_ms': (node.start - root.start) * 1000 if node.start is not None else None,
+            'duration_ms': node.duration * 1000 if node.duration is not None else None,
+            'payload_bytes': node.payload_bytes,
+            'attrs': node.attrs,
+        })
+        for child in node.children:
+            visit(child, depth + 1)
+
+    visit(root, 0)
+    return rows
+
+
+def to_jsonl(root):
+    """
+    Serialize a run as JSON lines, one span per line with its parent's index.
+    """
+    lines = []
+    parents = []
+    for i, row in enumerate(flatten(root)):
+        del parents[row['depth']:]
+        lines.append(json.dumps(dict(row, id=i, parent=parents[-1] if parents else None), default=str))
+        parents.append(i)
+    return '\n'.join(lines) + '\n'
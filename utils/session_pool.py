@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class SessionPool:
+    """
+    Process-wide LRU pool of loaded sessions bounded by an approximate byte budget.
+
+    Concurrent requests for the same key wait on a single in-flight load
+    instead of each loading their own copy.
+    """
+
+    def __init__(self, max_bytes, sizeof, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # key -> [value, nbytes]
+        self._inflight = {}            # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader):
+        """
+        Return the pooled value for key, calling loader() once if it is missing.
+        A loader result of None is returned but never pooled.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._inflight[key]
+            if value is not None:
+                self._entries[key] = [value, self._sizeof(value)]
+                self._evict()
+        future.set_result(value)
+        return value
+
+    def peek(self, key):
+        """
+        Return the pooled value for key without loading or touching LRU order.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def put(self, key, value):
+        """
+        Insert a value loaded elsewhere (e.g. in a worker process).
+        """
+        with self._lock:
+            self._entries[key] = [value, self._sizeof(value)]
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def loading_keys(self):
+        """
+        Keys whose load is in flight.
+        """
+        with self._lock:
+            return list(self._inflight)
+
+    def resize(self, key):
+        """
+        Re-measure an entry after more data was loaded into it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[1] = self._sizeof(entry[0])
+            self._evict(keep=key)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def total_bytes(self):
+        return sum(nbytes for _, nbytes in self._entries.values())
+
+    def stats(self):
+        """
+        Return hit/miss/eviction counters and current occupancy.
+        """
+        with self._lock:
+            lookups = self.hits + self.coalesced + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.total_bytes(),
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+    def _evict(self, keep=None):
+        # Caller holds the lock. The most recent entry always survives, even
+        # when it alone exceeds the budget.
+        keep = keep if keep is not None else next(reversed(self._entries), None)
+        total = self.total_bytes()
+        count = len(self._entries)
+        for key in list(self._entries):
+            if total <= self.max_bytes and (self.max_entries is None or count <= self.max_entries):
+                break
+            if key == keep:
+                continue
+            total -= self._entries.pop(key)[1]
+            count -= 1
+            self.evictions += 1
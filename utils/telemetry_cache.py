@@ -0,0 +1,21 @@
+from utils.session_pool import SessionPool
+
+
+def frame_bytes(frame):
+    """
+    Approximate in-memory size of a telemetry frame.
+    """
+    return int(frame.memory_usage(deep=True).sum())
+
+
+class TelemetryCache(SessionPool):
+    """
+    LRU cache of extracted per-lap telemetry, bounded by entry count and bytes.
+
+    Keys are (session key, driver, lap number, channels), where channels is a
+    tuple of column names or None for the full merged telemetry. Cached frames
+    are shared between callers and must not be modified in place.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        super().__init__(max_bytes, frame_bytes, max_entries=max_entries)
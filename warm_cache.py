@@ -0,0 +1,153 @@
+"""
+Headless cache warm-up.
+
+Loads every (year, gp, session type) offered in the sidebar on a process pool
+so the first dashboard user does not pay the cold FastF1 load. Completed
+sessions are recorded in a manifest, so an interrupted run resumes where it
+stopped; sessions evicted from the cache since are loaded again. A run whose
+projected footprint exceeds the disk quota (F1_CACHE_MAX_GB) is refused, since
+later sessions would evict earlier ones and every resume would reload them.
+
+    uv run python warm_cache.py --years 2024 --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from components.sidebar import YEARS, CIRCUITS, SESSION_TYPES
+from utils.cache_manager import dir_bytes, fastf1_session_dir, key_str
+from utils.data_loader import CACHE_DIR, CACHE_MANAGER, CACHE_MAX_BYTES, DERIVED_STORE
+
+MANIFEST_PATH = os.path.join(CACHE_DIR, 'warmup_manifest.json')
+
+# Assumed cache footprint of one session until the manifest has measured some
+DEFAULT_SESSION_MB = 100
+
+
+def load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'completed': {}, 'failed': {}}
+
+
+def save_manifest(path, manifest):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def is_cached(key):
+    """
+    Whether a warmed session is still on disk; the disk quota (F1_CACHE_MAX_GB)
+    may have evicted it since it was recorded.
+    """
+    return DERIVED_STORE.has_session(key)
+
+
+def session_bytes_estimate(manifest):
+    """
+    Average cache footprint of the sessions warmed so far, or DEFAULT_SESSION_MB.
+    """
+    sizes = [result['cache_bytes'] for result in manifest['completed'].values()]
+    return sum(sizes) // len(sizes) if sizes else DEFAULT_SESSION_MB * 1024 ** 2
+
+
+def warm_session(key):
+    """
+    Load one session in a worker process and report load time and cache footprint.
+    """
+    import fastf1
+    from utils import data_loader
+
+    fastf1.set_log_level('WARNING')
+    start = time.perf_counter()
+    session = data_loader.load_session(*key)
+    seconds = time.perf_counter() - start
+    if session is None:
+        raise RuntimeError("session could not be loaded")
+
+    # Do not keep the session alive in this worker's pool
+    data_loader.SESSION_POOL.discard(key)
+
+    cache_bytes = dir_bytes(DERIVED_STORE.entry_dir(key))
+    session_dir = fastf1_session_dir(CACHE_DIR, session)
+    if session_dir:
+        cache_bytes += dir_bytes(session_dir)
+    return {'seconds': round(seconds, 2), 'cache_bytes': cache_bytes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm the FastF1 and derived caches for dashboard sessions.")
+    parser.add_argument('--years', type=int, nargs='+', default=YEARS)
+    parser.add_argument('--gps', nargs='+', default=CIRCUITS)
+    parser.add_argument('--sessions', nargs='+', default=SESSION_TYPES)
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--manifest', default=MANIFEST_PATH)
+    parser.add_argument('--retry-failed', action='store_true', help="Retry sessions that failed in a previous run")
+    parser.add_argument('--ignore-quota', action='store_true',
+                        help="Warm even if the sessions do not fit in the disk quota (F1_CACHE_MAX_GB)")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    keys = [(year, gp, session_type) for year in args.years for gp in args.gps for session_type in args.sessions]
+    # Sessions evicted from the cache since they were warmed are loaded again
+    evicted = [key for key in keys if key_str(key) in manifest['completed'] and not is_cached(key)]
+    for key in evicted:
+        del manifest['completed'][key_str(key)]
+    done = set(manifest['completed'])
+    if not args.retry_failed:
+        done |= set(manifest['failed'])
+    pending = [key for key in keys if key_str(key) not in done]
+
+    print(f"{len(keys)} sessions, {len(keys) - len(pending)} already done, {len(evicted)} evicted since warmed, "
+          f"{len(pending)} to load "
+          f"with {args.workers} workers")
+
+    used = CACHE_MANAGER.total_bytes()
+    projected = used + len(pending) * session_bytes_estimate(manifest)
+    check_quota = CACHE_MAX_BYTES is not None and not args.ignore_quota
+    if check_quota and projected > CACHE_MAX_BYTES:
+        raise SystemExit(
+            f"Warming {len(pending)} sessions would take the cache to about {projected / 1024 ** 3:.1f} GB, "
+            f"over its {CACHE_MAX_BYTES / 1024 ** 3:.1f} GB quota (F1_CACHE_MAX_GB), so later sessions would "
+            f"evict earlier ones. Raise the quota, narrow --years/--gps/--sessions or pass --ignore-quota."
+        )
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(warm_session, key): key for key in pending}
+        for n, future in enumerate(as_completed(futures), 1):
+            if future.cancelled():
+                continue
+            key = futures[future]
+            name = key_str(key)
+            try:
+                result = future.result()
+            except Exception as e:
+                manifest['failed'][name] = str(e)
+                print(f"[{n}/{len(pending)}] {name}: FAILED ({e})")
+            else:
+                manifest['failed'].pop(name, None)
+                manifest['completed'][name] = result
+                print(f"[{n}/{len(pending)}] {name}: {result['seconds']:.1f} s, "
+                      f"{result['cache_bytes'] / 1024 ** 2:.1f} MB")
+                used += result['cache_bytes']
+            save_manifest(args.manifest, manifest)
+            # Sessions turned out larger than projected: stop before they evict each other
+            if check_quota and used > CACHE_MAX_BYTES:
+                cancelled = sum(f.cancel() for f in futures)
+                if cancelled:
+                    print(f"Cache quota reached, {cancelled} sessions not loaded")
+
+    total_mb = sum(r['cache_bytes'] for r in manifest['completed'].values()) / 1024 ** 2
+    print(f"Done in {time.perf_counter() - start:.1f} s: {len(manifest['completed'])} sessions cached "
+          f"({total_mb:.1f} MB), {len(manifest['failed'])} failed")
+
+
+if __name__ == '__main__':
+    main()